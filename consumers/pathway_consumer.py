@@ -17,9 +17,13 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
 from config.kafka_config import CONSUMER_CONFIG, KAFKA_TOPICS
-from utils.common import setup_logging, get_current_timestamp, save_json_file
+from utils.common import setup_logging, get_current_timestamp, save_json_file, validate_kafka_messages
 from consumers.route_optimizer import RouteOptimizer, RouteOption
 
+# Most records fetched by one consumer poll; each batch is validated at once
+CONSUMER_POLL_MAX_RECORDS = 1000
+CONSUMER_POLL_TIMEOUT_MS = 1000
+
 class PathwayTransitConsumer:
     """Pathway-based consumer for real-time transit data processing"""
     
@@ -62,6 +66,50 @@ class PathwayTransitConsumer:
         try:
             # Parse message
             message_data = json.loads(message.value)
+            return self._route_message(message, message_data)
+                
+        except json.JSONDecodeError as e:
+            self.logger.error(f"JSON decode error: {e}")
+            return False
+        except Exception as e:
+            self.logger.error(f"Error processing message: {e}")
+            return False
+    
+    def process_batch(self, messages: List[Any]) -> int:
+        """
+        Process a batch of Kafka messages from one poll
+        
+        Every message is parsed first, then the batch's required fields are
+        checked together; only valid messages reach the data handlers.
+        
+        Args:
+            messages: Kafka message objects
+            
+        Returns:
+            Number of messages processed successfully
+        """
+        parsed = []
+        for message in messages:
+            try:
+                parsed.append((message, json.loads(message.value)))
+            except (json.JSONDecodeError, TypeError) as e:
+                self.logger.error(f"JSON decode error in message from {message.topic}: {e}")
+        
+        valid = validate_kafka_messages([message_data for _, message_data in parsed])
+        
+        processed = 0
+        for (message, message_data), is_valid in zip(parsed, valid.tolist()):
+            if is_valid and self._route_message(message, message_data):
+                processed += 1
+                self.logger.debug(f"Successfully processed message from {message.topic}")
+            else:
+                self.logger.warning(f"Failed to process message from {message.topic}")
+        
+        return processed
+    
+    def _route_message(self, message, message_data: Dict[str, Any]) -> bool:
+        """Send a parsed message to the handler for its data type"""
+        try:
             topic = message.topic
             key = message.key
             
@@ -86,9 +134,6 @@ class PathwayTransitConsumer:
                 self.logger.warning(f"Unknown data type: {data_type}")
                 return False
                 
-        except json.JSONDecodeError as e:
-            self.logger.error(f"JSON decode error: {e}")
-            return False
         except Exception as e:
             self.logger.error(f"Error processing message: {e}")
             return False
@@ -282,13 +327,13 @@ class PathwayTransitConsumer:
         self.logger.info("Starting Kafka message consumption...")
         
         try:
-            for message in self.consumer:
-                success = self.process_message(message)
-                
-                if success:
-                    self.logger.debug(f"Successfully processed message from {message.topic}")
-                else:
-                    self.logger.warning(f"Failed to process message from {message.topic}")
+            while True:
+                batches = self.consumer.poll(
+                    timeout_ms=CONSUMER_POLL_TIMEOUT_MS,
+                    max_records=CONSUMER_POLL_MAX_RECORDS
+                )
+                for messages in batches.values():
+                    self.process_batch(messages)
                 
         except KeyboardInterrupt:
             self.logger.info("Consumer stopped by user")
@@ -168,8 +168,12 @@ class BMRCLDataFetcher:
     
     @error_handler_decorator("bmrcl_fetcher")
     @performance_monitor("bmrcl_fetcher")
-    def fetch_live_positions(self) -> Dict[str, Any]:
-        """Fetch live train positions using real-time APIs and enhanced simulation"""
+    def fetch_live_positions(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Fetch live train positions using real-time APIs and enhanced simulation
+        
+        Args:
+            limit: Optional maximum number of entities to return
+        """
         try:
             positions_data = {
                 "header": {
@@ -183,13 +187,14 @@ class BMRCLDataFetcher:
             # Try to fetch from Google Maps Transit API (BMRCL integration)
             real_data = self._fetch_from_google_transit_api()
             if real_data and len(real_data) > 0:
-                positions_data["entity"] = real_data
+                positions_data["entity"] = real_data[:limit] if limit is not None else real_data
                 logger.info(f"Fetched {len(real_data)} real-time train positions from Google Transit API")
                 return positions_data
             
             # Fallback to enhanced simulation with real station coordinates
             logger.info("Google Transit API unavailable, using enhanced simulation with real station coordinates")
-            positions_data["entity"] = self._generate_enhanced_metro_positions()
+            entities = self._generate_enhanced_metro_positions()
+            positions_data["entity"] = entities[:limit] if limit is not None else entities
             
             logger.info(f"Generated {len(positions_data['entity'])} enhanced live train positions")
             return positions_data
@@ -107,8 +107,12 @@ class BMTCDataFetcher:
     
     @error_handler_decorator("bmtc_fetcher")
     @performance_monitor("bmtc_fetcher")  
-    def fetch_live_positions(self) -> Dict[str, Any]:
-        """Fetch live bus positions using real-time APIs and fallback to enhanced simulation"""
+    def fetch_live_positions(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Fetch live bus positions using real-time APIs and fallback to enhanced simulation
+        
+        Args:
+            limit: Optional maximum number of entities to return
+        """
         try:
             positions_data = {
                 "header": {
@@ -122,13 +126,14 @@ class BMTCDataFetcher:
             # Try to fetch from real BMTC API first
             real_data = self._fetch_from_bmtc_api()
             if real_data and len(real_data) > 0:
-                positions_data["entity"] = real_data
+                positions_data["entity"] = real_data[:limit] if limit is not None else real_data
                 logger.info(f"Fetched {len(real_data)} real-time bus positions from BMTC API")
                 return positions_data
             
             # Fallback to enhanced simulation with real route patterns
             logger.info("BMTC API unavailable, using enhanced simulation with real route patterns")
-            positions_data["entity"] = self._generate_enhanced_positions()
+            entities = self._generate_enhanced_positions()
+            positions_data["entity"] = entities[:limit] if limit is not None else entities
             
             logger.info(f"Generated {len(positions_data['entity'])} enhanced live bus positions")
             return positions_data
@@ -6,16 +6,22 @@ Integrates traffic, taxi, and bus data for WayForge routing system
 
 import pathway as pw
 import json
+import orjson
 import time
 import asyncio
+import concurrent.futures
 import websockets
 import requests
 import aiohttp
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Iterator, Sequence
+from dataclasses import dataclass, fields
 import logging
 from datetime import datetime, timedelta
 import math
+import itertools
+import functools
+import heapq
+import numpy as np
 
 from utils.common import setup_logging
 from utils.error_handler import error_handler_decorator, performance_monitor
@@ -23,7 +29,26 @@ from utils.routing_service import routing_service, RoutePoint
 
 logger = setup_logging("pathway_streaming")
 
-@dataclass
+@functools.lru_cache(maxsize=4096)
+def _next_stop_label(vehicle_id: str) -> str:
+    """Display label for a vehicle's next stop (fleet IDs repeat across ticks)"""
+    return f"Stop near {vehicle_id[-3:]}"
+
+def _live_vehicles(feed: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Vehicle records from a fetcher's live position feed
+    
+    Fetchers return a GTFS-realtime style dict; each vehicle carries its
+    coordinates and speed (km/h) under 'position' and its route under 'trip'.
+    """
+    return [entity['vehicle'] for entity in feed.get('entity', ()) if 'vehicle' in entity]
+
+# Fallback ETAs for vehicles reporting no speed, indexed by the last byte of
+# the vehicle ID (deterministic across runs, unlike hash())
+_BUS_FALLBACK_ETA = tuple(5 + (i % 15) for i in range(256))
+_METRO_FALLBACK_ETA = tuple(3 + (i % 10) for i in range(256))
+
+@dataclass(slots=True)
 class VehiclePosition:
     """Real-time vehicle position data"""
     vehicle_id: str
@@ -36,6 +61,22 @@ class VehiclePosition:
     occupancy_status: str
     next_stop_id: Optional[str] = None
     delay_minutes: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-ready dict without the generic asdict walk"""
+        timestamp = self.timestamp
+        return {
+            'vehicle_id': self.vehicle_id,
+            'route_id': self.route_id,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'speed_kmh': self.speed_kmh,
+            'heading': self.heading,
+            'timestamp': timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp,
+            'occupancy_status': self.occupancy_status,
+            'next_stop_id': self.next_stop_id,
+            'delay_minutes': self.delay_minutes
+        }
 
 @dataclass
 class FareUpdate:
@@ -47,7 +88,7 @@ class FareUpdate:
     effective_time: datetime
     zone: str
 
-@dataclass
+@dataclass(slots=True)
 class TrafficData:
     """Real-time traffic information"""
     road_segment_id: str
@@ -59,7 +100,7 @@ class TrafficData:
     estimated_delay_minutes: int
     timestamp: datetime
 
-@dataclass
+@dataclass(slots=True)
 class TaxiAvailability:
     """Real-time taxi availability and pricing"""
     service_provider: str  # uber, ola, rapido
@@ -73,7 +114,7 @@ class TaxiAvailability:
     available_count: int
     timestamp: datetime
 
-@dataclass
+@dataclass(slots=True)
 class BusSchedule:
     """Real-time bus schedule information"""
     route_id: str
@@ -97,9 +138,104 @@ class NearestStop:
     distance_meters: float
     walking_time_minutes: int
 
+class RecordBatch:
+    """Columnar (struct-of-arrays) buffer of records.
+    
+    Fetchers append column values directly instead of creating one dataclass
+    instance per record; rows are only materialized at the serialization
+    boundary via to_rows(), and iterating the batch yields a lazy dataclass view.
+    """
+    record_type: type = None
+    numeric_dtypes: Dict[str, Any] = {}
+    field_names: tuple = ()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Resolve dataclass fields once per record type instead of per batch
+        cls.field_names = tuple(f.name for f in fields(cls.record_type))
+    
+    def __init__(self):
+        self._names = self.field_names
+        self._columns: Dict[str, list] = {name: [] for name in self._names}
+    
+    def append(self, **values):
+        """Append a single record given as keyword column values"""
+        for name in self._names:
+            self._columns[name].append(values[name])
+    
+    def column(self, name: str):
+        """Return a column, as a NumPy array for numeric fields"""
+        dtype = self.numeric_dtypes.get(name)
+        if dtype is not None:
+            return np.asarray(self._columns[name], dtype=dtype)
+        return self._columns[name]
+    
+    def take(self, indices: Sequence[int]) -> 'RecordBatch':
+        """Return a new batch holding only the rows at the given indices"""
+        subset = type(self)()
+        for name, values in self._columns.items():
+            subset._columns[name] = [values[i] for i in indices]
+        return subset
+    
+    def to_rows(self) -> Iterator[Dict[str, Any]]:
+        """Yield one plain dict per record"""
+        names = self._names
+        for values in zip(*self._columns.values()):
+            yield dict(zip(names, values))
+    
+    def __len__(self) -> int:
+        return len(self._columns[self._names[0]])
+    
+    def __iter__(self):
+        record_type = self.record_type
+        for row in self.to_rows():
+            yield record_type(**row)
+
+class TrafficBatch(RecordBatch):
+    """Columnar batch of TrafficData records"""
+    record_type = TrafficData
+    numeric_dtypes = {
+        'latitude': np.float64,
+        'longitude': np.float64,
+        'speed_kmh': np.float64,
+        'estimated_delay_minutes': np.int64
+    }
+
+class TaxiBatch(RecordBatch):
+    """Columnar batch of TaxiAvailability records"""
+    record_type = TaxiAvailability
+    numeric_dtypes = {
+        'latitude': np.float64,
+        'longitude': np.float64,
+        'base_fare': np.float64,
+        'per_km_rate': np.float64,
+        'surge_multiplier': np.float64,
+        'eta_minutes': np.int64,
+        'available_count': np.int64
+    }
+
+class BusScheduleBatch(RecordBatch):
+    """Columnar batch of BusSchedule records"""
+    record_type = BusSchedule
+    numeric_dtypes = {'delay_minutes': np.int64}
+
+class NearestStopBatch(RecordBatch):
+    """Columnar batch of NearestStop records"""
+    record_type = NearestStop
+    numeric_dtypes = {
+        'latitude': np.float64,
+        'longitude': np.float64,
+        'distance_meters': np.float64,
+        'walking_time_minutes': np.int64
+    }
+
 class PathwayTransitStreaming:
     """Main class for handling real-time transit data streaming with Pathway"""
     
+    # Per-second cache for the ISO timestamp stamped on responses
+    _last_iso_sec = 0
+    _last_iso_str = ''
+    
     def __init__(self):
         """Initialize Pathway streaming service with API configurations"""
         # Initialize logger first
@@ -122,6 +258,11 @@ class PathwayTransitStreaming:
         self.taxi_table = None
         self.bus_schedule_table = None
         
+        # Dedicated pool for blocking fetcher I/O, isolated from the default executor
+        self._fetch_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix='transit-fetch'
+        )
+        
         # Initialize real-time data fetchers
         self._initialize_data_fetchers()
         
@@ -132,6 +273,10 @@ class PathwayTransitStreaming:
         self.websocket_clients = set()
         self.websocket_port = 8766
         
+        # Preallocated mock vehicle buffer, built on first use
+        self._mock_vehicles = None
+        self._mock_vehicle_ids = None
+        
         # API configurations for external data sources
         self.api_config = {
             "traffic_api_key": "your_traffic_api_key",
@@ -214,19 +359,21 @@ class PathwayTransitStreaming:
         except Exception as e:
             self.logger.error(f"Error setting up Pathway tables: {e}")
 
-    async def fetch_real_time_traffic(self, lat: float, lng: float, radius_km: float = 5) -> List[TrafficData]:
+    async def fetch_real_time_traffic(self, lat: float, lng: float, radius_km: float = 5) -> TrafficBatch:
         """Fetch real-time traffic data from external APIs"""
         try:
+            now = datetime.now()
+            
             # Use the real-time traffic fetcher if available
             if hasattr(self, 'traffic_fetcher') and self.traffic_fetcher:
-                traffic_data_response = await asyncio.to_thread(
+                traffic_data_response = await self._run_fetch(
                     self.traffic_fetcher.fetch_real_time_traffic
                 )
                 traffic_conditions = traffic_data_response.get('traffic_conditions', [])
                 
-                traffic_data = []
+                traffic_data = TrafficBatch()
                 for condition in traffic_conditions:
-                    traffic_data.append(TrafficData(
+                    traffic_data.append(
                         road_segment_id=condition.get('segment_id', f"segment_{int(time.time())}"),
                         latitude=condition.get('latitude', lat),
                         longitude=condition.get('longitude', lng),
@@ -234,13 +381,13 @@ class PathwayTransitStreaming:
                         congestion_level=condition.get('congestion_level', 'medium'),
                         incident_reported=condition.get('incident_reported', False),
                         estimated_delay_minutes=condition.get('estimated_delay_minutes', 0),
-                        timestamp=datetime.now()
-                    ))
+                        timestamp=now
+                    )
                 
                 return traffic_data
             else:
                 # Fallback to enhanced simulation
-                traffic_data = []
+                traffic_data = TrafficBatch()
                 
                 # Simulate traffic data for major roads in Bangalore
                 major_roads = [
@@ -251,31 +398,38 @@ class PathwayTransitStreaming:
                     {"name": "Electronic City", "lat": 12.8456, "lng": 77.6603, "congestion": "high"}
                 ]
                 
+                # Bind hot-loop lookups to locals
+                dist = self._haversine_scalar
+                src_phi, cos_src, src_lng_rad = self._source_trig(lat, lng)
+                add = traffic_data.append
+                
                 for road in major_roads:
-                    distance = self._calculate_distance(lat, lng, road["lat"], road["lng"])
+                    road_lat, road_lng = road["lat"], road["lng"]
+                    distance = dist(src_phi, cos_src, src_lng_rad, road_lat, road_lng)
                     if distance <= radius_km:
                         congestion_delays = {"low": 2, "medium": 8, "high": 15, "severe": 25}
-                        traffic_data.append(TrafficData(
+                        add(
                             road_segment_id=f"road_{road['name'].replace(' ', '_').lower()}",
-                            latitude=road["lat"],
-                            longitude=road["lng"],
+                            latitude=road_lat,
+                            longitude=road_lng,
                             speed_kmh=60 - (congestion_delays[road["congestion"]] * 2),
                             congestion_level=road["congestion"],
                             incident_reported=road["congestion"] in ["high", "severe"],
                             estimated_delay_minutes=congestion_delays[road["congestion"]],
-                            timestamp=datetime.now()
-                        ))
+                            timestamp=now
+                        )
                 
                 return traffic_data
             
         except Exception as e:
             self.logger.error(f"Error fetching traffic data: {e}")
-            return []
+            return TrafficBatch()
 
-    async def fetch_taxi_availability(self, lat: float, lng: float) -> List[TaxiAvailability]:
+    async def fetch_taxi_availability(self, lat: float, lng: float) -> TaxiBatch:
         """Fetch real-time taxi availability and pricing"""
         try:
-            taxi_data = []
+            taxi_data = TaxiBatch()
+            now = datetime.now()
             
             # Simulate taxi availability data
             providers = ["uber", "ola", "rapido"]
@@ -292,7 +446,7 @@ class PathwayTransitStreaming:
                         base_fares = {"mini": 25, "sedan": 35, "suv": 50, "auto": 15, "bike": 10}
                         per_km_rates = {"mini": 12, "sedan": 15, "suv": 18, "auto": 8, "bike": 5}
                         
-                        taxi_data.append(TaxiAvailability(
+                        taxi_data.append(
                             service_provider=provider,
                             vehicle_type=vehicle_type,
                             latitude=lat + (0.01 * (i - 1)),
@@ -302,40 +456,49 @@ class PathwayTransitStreaming:
                             surge_multiplier=surge,
                             eta_minutes=2 + i,
                             available_count=5 - i,
-                            timestamp=datetime.now()
-                        ))
+                            timestamp=now
+                        )
             
             return taxi_data
             
         except Exception as e:
             self.logger.error(f"Error fetching taxi availability: {e}")
-            return []
+            return TaxiBatch()
 
-    async def fetch_bus_schedules(self, lat: float, lng: float, radius_km: float = 2) -> List[BusSchedule]:
+    async def fetch_bus_schedules(self, lat: float, lng: float, radius_km: float = 2,
+                                  bmtc_static: Optional[Dict[str, Any]] = None) -> BusScheduleBatch:
         """Fetch real-time bus schedules and availability"""
         try:
-            bus_schedules = []
+            bus_schedules = BusScheduleBatch()
+            now = datetime.now()
             
             # Use the real-time BMTC fetcher if available
             if hasattr(self, 'bmtc_fetcher') and self.bmtc_fetcher:
                 # Get live bus positions from BMTC fetcher
-                live_buses = await asyncio.to_thread(self.bmtc_fetcher.fetch_live_positions)
+                live_buses = await self._run_fetch(self.bmtc_fetcher.fetch_live_positions)
+                
+                # Bind hot-loop lookups to locals
+                dist = self._haversine_scalar
+                src_phi, cos_src, src_lng_rad = self._source_trig(lat, lng)
+                add = bus_schedules.append
                 
                 # Convert live positions to bus schedules
-                for bus in live_buses:
+                for bus in _live_vehicles(live_buses):
                     # Calculate distance from user location
-                    distance = self._calculate_distance(lat, lng, bus['latitude'], bus['longitude'])
+                    position = bus['position']
+                    distance = dist(src_phi, cos_src, src_lng_rad, position['latitude'], position['longitude'])
                     if distance <= radius_km:
                         # Estimate arrival time based on distance and speed
-                        if bus['speed_kmh'] > 0:
-                            eta_minutes = int((distance / bus['speed_kmh']) * 60)
+                        speed_kmh = position.get('speed', 0)
+                        if speed_kmh > 0:
+                            eta_minutes = int((distance / speed_kmh) * 60)
                         else:
-                            eta_minutes = 5 + (hash(bus['vehicle_id']) % 15)
+                            eta_minutes = _BUS_FALLBACK_ETA[ord(bus['vehicle_id'][-1]) & 0xFF]
                         
-                        arrival_time = datetime.now() + timedelta(minutes=eta_minutes)
+                        arrival_time = now + timedelta(minutes=eta_minutes)
                         
-                        bus_schedules.append(BusSchedule(
-                            route_id=bus['route_id'],
+                        add(
+                            route_id=bus['trip']['route_id'],
                             bus_stop_id=f"BS_{bus['vehicle_id'][-3:]}",
                             bus_stop_name=f"Stop near {bus['vehicle_id']}",
                             next_arrival_time=arrival_time,
@@ -343,35 +506,44 @@ class PathwayTransitStreaming:
                             bus_number=bus['vehicle_id'],
                             occupancy_level=bus.get('occupancy_status', 'medium'),
                             wheelchair_accessible=(hash(bus['vehicle_id']) % 2 == 0),
-                            timestamp=datetime.now()
-                        ))
+                            timestamp=now
+                        )
             else:
                 # Fallback to static data simulation
-                try:
-                    with open('data/static/bmtc_static.json', 'r') as f:
-                        bmtc_data = json.load(f)
-                        
+                if bmtc_static is None:
+                    bmtc_static = self._load_bmtc_static()
+                
+                if bmtc_static is None:
+                    self.logger.warning("BMTC static data file not found")
+                else:
+                    # Bind hot-loop lookups to locals
+                    dist = self._haversine_scalar
+                    src_phi, cos_src, src_lng_rad = self._source_trig(lat, lng)
+                    add = bus_schedules.append
+                    
                     # Find nearby bus stops
                     nearby_stops = []
-                    for route in bmtc_data.get('routes', []):
+                    add_stop = nearby_stops.append
+                    for route in bmtc_static.get('routes', []):
                         for stop in route.get('stops', []):
-                            distance = self._calculate_distance(lat, lng, stop['lat'], stop['lng'])
+                            stop_lat, stop_lng = stop['lat'], stop['lng']
+                            distance = dist(src_phi, cos_src, src_lng_rad, stop_lat, stop_lng)
                             if distance <= radius_km:
-                                nearby_stops.append({
+                                add_stop({
                                     'route_id': route['route_id'],
                                     'stop_id': stop['stop_id'],
                                     'stop_name': stop['stop_name'],
-                                    'lat': stop['lat'],
-                                    'lng': stop['lng']
+                                    'lat': stop_lat,
+                                    'lng': stop_lng
                                 })
                     
                     # Generate schedule data for nearby stops
                     for stop in nearby_stops[:10]:  # Limit to 10 nearest stops
                         for i in range(3):  # 3 upcoming buses per stop
-                            arrival_time = datetime.now() + timedelta(minutes=5 + (i * 10))
+                            arrival_time = now + timedelta(minutes=5 + (i * 10))
                             delay = (hash(f"{stop['stop_id']}{i}") % 5)
                             
-                            bus_schedules.append(BusSchedule(
+                            add(
                                 route_id=stop['route_id'],
                                 bus_stop_id=stop['stop_id'],
                                 bus_stop_name=stop['stop_name'],
@@ -380,44 +552,44 @@ class PathwayTransitStreaming:
                                 bus_number=f"KA-01-{1000 + i}",
                                 occupancy_level=["low", "medium", "high"][i % 3],
                                 wheelchair_accessible=i % 2 == 0,
-                                timestamp=datetime.now()
-                            ))
-                            
-                except FileNotFoundError:
-                    self.logger.warning("BMTC static data file not found")
+                                timestamp=now
+                            )
             
             return bus_schedules
             
         except Exception as e:
             self.logger.error(f"Error fetching bus schedules: {e}")
-            return []
+            return BusScheduleBatch()
 
-    def find_nearest_stops(self, lat: float, lng: float, max_distance_km: float = 1.0) -> List[NearestStop]:
+    def find_nearest_stops(self, lat: float, lng: float, max_distance_km: float = 1.0,
+                           bmtc_static: Optional[Dict[str, Any]] = None) -> NearestStopBatch:
         """Find nearest bus stops and metro stations"""
         try:
-            nearest_stops = []
+            nearest_stops = NearestStopBatch()
+            
+            # Bind hot-loop lookups to locals
+            dist = self._haversine_scalar
+            src_phi, cos_src, src_lng_rad = self._source_trig(lat, lng)
+            add = nearest_stops.append
             
             # Load bus stops
-            try:
-                with open('data/static/bmtc_static.json', 'r') as f:
-                    bmtc_data = json.load(f)
-                    
+            bmtc_data = bmtc_static if bmtc_static is not None else self._load_bmtc_static()
+            if bmtc_data is not None:
                 for route in bmtc_data.get('routes', []):
                     for stop in route.get('stops', []):
-                        distance = self._calculate_distance(lat, lng, stop['lat'], stop['lng'])
+                        stop_lat, stop_lng = stop['lat'], stop['lng']
+                        distance = dist(src_phi, cos_src, src_lng_rad, stop_lat, stop_lng)
                         if distance <= max_distance_km:
                             walking_time = int(distance * 1000 / 80)  # 80 m/min walking speed
-                            nearest_stops.append(NearestStop(
+                            add(
                                 stop_id=stop['stop_id'],
                                 stop_name=stop['stop_name'],
                                 stop_type="bus_stop",
-                                latitude=stop['lat'],
-                                longitude=stop['lng'],
+                                latitude=stop_lat,
+                                longitude=stop_lng,
                                 distance_meters=distance * 1000,
                                 walking_time_minutes=walking_time
-                            ))
-            except FileNotFoundError:
-                pass
+                            )
             
             # Load metro stations
             try:
@@ -425,28 +597,49 @@ class PathwayTransitStreaming:
                     bmrcl_data = json.load(f)
                     
                 for station in bmrcl_data.get('stations', []):
-                    distance = self._calculate_distance(lat, lng, station['lat'], station['lng'])
+                    station_lat, station_lng = station['lat'], station['lng']
+                    distance = dist(src_phi, cos_src, src_lng_rad, station_lat, station_lng)
                     if distance <= max_distance_km:
                         walking_time = int(distance * 1000 / 80)  # 80 m/min walking speed
-                        nearest_stops.append(NearestStop(
+                        add(
                             stop_id=station['station_id'],
                             stop_name=station['station_name'],
                             stop_type="metro_station",
-                            latitude=station['lat'],
-                            longitude=station['lng'],
+                            latitude=station_lat,
+                            longitude=station_lng,
                             distance_meters=distance * 1000,
                             walking_time_minutes=walking_time
-                        ))
+                        )
             except FileNotFoundError:
                 pass
             
             # Sort by distance
-            nearest_stops.sort(key=lambda x: x.distance_meters)
-            return nearest_stops[:10]  # Return top 10 nearest stops
+            order = np.argsort(nearest_stops.column('distance_meters'), kind='stable')
+            return nearest_stops.take(order[:10].tolist())  # Return top 10 nearest stops
             
         except Exception as e:
             self.logger.error(f"Error finding nearest stops: {e}")
-            return []
+            return NearestStopBatch()
+
+    def _run_fetch(self, func, *args):
+        """Run a blocking fetcher call on the dedicated fetch pool"""
+        return asyncio.get_running_loop().run_in_executor(self._fetch_pool, func, *args)
+
+    def _load_bmtc_static(self) -> Optional[Dict[str, Any]]:
+        """Load BMTC static data, returning None if the file is missing"""
+        try:
+            with open('data/static/bmtc_static.json', 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _now_iso(self) -> str:
+        """Return the current time as an ISO string, cached per second"""
+        t = int(time.time())
+        if t != self._last_iso_sec:
+            self._last_iso_str = datetime.fromtimestamp(t).isoformat()
+            self._last_iso_sec = t
+        return self._last_iso_str
 
     def _calculate_distance(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
         """Calculate distance between two points using Haversine formula"""
@@ -463,23 +656,73 @@ class PathwayTransitStreaming:
         
         return R * c
 
+    @staticmethod
+    def _source_trig(lat: float, lng: float):
+        """Precompute the loop-invariant trig terms for a source point"""
+        src_phi = math.radians(lat)
+        return src_phi, math.cos(src_phi), math.radians(lng)
+
+    @staticmethod
+    def _haversine_scalar(src_phi: float, cos_src: float, src_lng_rad: float,
+                          lat: float, lng: float) -> float:
+        """Haversine distance (km) from a source given its precomputed trig terms"""
+        phi = math.radians(lat)
+        delta_lat = phi - src_phi
+        delta_lng = math.radians(lng) - src_lng_rad
+        
+        a = (math.sin(delta_lat / 2) ** 2 +
+             cos_src * math.cos(phi) * math.sin(delta_lng / 2) ** 2)
+        return 2 * 6371 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    def _calculate_distances(self, lat: float, lng: float,
+                             lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """Vectorized Haversine distance (km) from one point to arrays of points"""
+        src_lat_rad = math.radians(lat)
+        src_lng_rad = math.radians(lng)
+        lats_rad = np.deg2rad(lats)
+        lngs_rad = np.deg2rad(lngs)
+        
+        dlat = lats_rad - src_lat_rad
+        dlng = lngs_rad - src_lng_rad
+        a = np.sin(dlat / 2) ** 2 + math.cos(src_lat_rad) * np.cos(lats_rad) * np.sin(dlng / 2) ** 2
+        return 2 * 6371.0 * np.arcsin(np.sqrt(a))
+
+    def _points_within_radius(self, lat: float, lng: float, lats: np.ndarray,
+                              lngs: np.ndarray, radius_km: float):
+        """Return (indices, distances) of points within radius_km, in input order.
+        
+        A cheap equirectangular bounding box discards far-away points before
+        the exact Haversine distance is computed for the survivors.
+        """
+        dlat_max = radius_km / 111.0
+        dlng_max = radius_km / (111.0 * math.cos(math.radians(lat)))
+        in_box = np.nonzero((np.abs(lats - lat) <= dlat_max) & (np.abs(lngs - lng) <= dlng_max))[0]
+        
+        distances = self._calculate_distances(lat, lng, lats[in_box], lngs[in_box])
+        within = distances <= radius_km
+        return in_box[within], distances[within]
+
     async def get_comprehensive_transit_data(self, lat: float, lng: float) -> Dict[str, Any]:
         """Get comprehensive real-time transit data for a location"""
         try:
+            # Load static stops once and share them between the stop-based fetchers
+            bmtc_static = self._load_bmtc_static()
+            
             # Fetch all data concurrently
             traffic_data, taxi_data, bus_schedules, nearest_stops = await asyncio.gather(
                 self.fetch_real_time_traffic(lat, lng),
                 self.fetch_taxi_availability(lat, lng),
-                self.fetch_bus_schedules(lat, lng),
-                asyncio.create_task(asyncio.to_thread(self.find_nearest_stops, lat, lng))
+                self.fetch_bus_schedules(lat, lng, bmtc_static=bmtc_static),
+                asyncio.create_task(asyncio.to_thread(self.find_nearest_stops, lat, lng,
+                                                      bmtc_static=bmtc_static))
             )
             
             return {
-                "traffic": [asdict(t) for t in traffic_data],
-                "taxis": [asdict(t) for t in taxi_data],
-                "bus_schedules": [asdict(b) for b in bus_schedules],
-                "nearest_stops": [asdict(n) for n in nearest_stops],
-                "timestamp": datetime.now().isoformat()
+                "traffic": list(traffic_data.to_rows()),
+                "taxis": list(taxi_data.to_rows()),
+                "bus_schedules": list(bus_schedules.to_rows()),
+                "nearest_stops": list(nearest_stops.to_rows()),
+                "timestamp": self._now_iso()
             }
             
         except Exception as e:
@@ -501,7 +744,7 @@ class PathwayTransitStreaming:
             except RuntimeError:
                 # No event loop running, safe to use asyncio.run
                 traffic_data = asyncio.run(self.fetch_real_time_traffic(lat, lng, radius_km))
-            return [asdict(t) for t in traffic_data]
+            return list(traffic_data.to_rows())
         except Exception as e:
             self.logger.error(f"Error getting traffic data: {e}")
             return []
@@ -517,7 +760,7 @@ class PathwayTransitStreaming:
                     bus_schedules = future.result(timeout=10)
             except RuntimeError:
                 bus_schedules = asyncio.run(self.fetch_bus_schedules(lat, lng, radius_km))
-            return [asdict(b) for b in bus_schedules]
+            return list(bus_schedules.to_rows())
         except Exception as e:
             self.logger.error(f"Error getting bus schedules: {e}")
             return []
@@ -533,7 +776,7 @@ class PathwayTransitStreaming:
                     taxi_data = future.result(timeout=10)
             except RuntimeError:
                 taxi_data = asyncio.run(self.fetch_taxi_availability(lat, lng))
-            return [asdict(t) for t in taxi_data]
+            return list(taxi_data.to_rows())
         except Exception as e:
             self.logger.error(f"Error getting taxi availability: {e}")
             return []
@@ -554,7 +797,7 @@ class PathwayTransitStreaming:
                 'bus_base': 5,
                 'metro_min': 10,
                 'taxi_base': 50,
-                'last_updated': datetime.now().isoformat()
+                'last_updated': self._now_iso()
             }
         except Exception as e:
             self.logger.error(f"Error getting current fares: {e}")
@@ -568,46 +811,48 @@ class PathwayTransitStreaming:
             # Get real-time bus positions
             if hasattr(self, 'bmtc_fetcher') and self.bmtc_fetcher:
                 try:
-                    bus_data = self.bmtc_fetcher.fetch_live_positions()
+                    bus_data = self.bmtc_fetcher.fetch_live_positions(limit=5)
                     if bus_data and 'entity' in bus_data and isinstance(bus_data['entity'], list):
-                        bus_positions = bus_data['entity']
-                        for bus in bus_positions[:5]:  # Limit to 5 buses for performance
-                            if isinstance(bus, dict) and 'vehicle' in bus:
-                                vehicle_info = bus['vehicle']
-                                position = vehicle_info.get('position', {})
-                                vehicle_positions.append({
-                                    'type': 'bus',
-                                    'route': vehicle_info.get('trip', {}).get('route_id', 'Unknown'),
-                                    'vehicle_id': vehicle_info.get('vehicle', {}).get('id', 'Unknown'),
-                                    'lat': position.get('latitude', 12.9716),
-                                    'lng': position.get('longitude', 77.5946),
-                                    'speed': position.get('speed', 0),
-                                    'occupancy': vehicle_info.get('occupancy_status', 'medium')
-                                })
+                        bus_positions = (
+                            b for b in bus_data['entity'] if isinstance(b, dict) and 'vehicle' in b
+                        )
+                        for bus in itertools.islice(bus_positions, 5):  # Limit to 5 buses for performance
+                            vehicle_info = bus['vehicle']
+                            position = vehicle_info.get('position', {})
+                            vehicle_positions.append({
+                                'type': 'bus',
+                                'route': vehicle_info.get('trip', {}).get('route_id', 'Unknown'),
+                                'vehicle_id': vehicle_info.get('vehicle', {}).get('id', 'Unknown'),
+                                'lat': position.get('latitude', 12.9716),
+                                'lng': position.get('longitude', 77.5946),
+                                'speed': position.get('speed', 0),
+                                'occupancy': vehicle_info.get('occupancy_status', 'medium')
+                            })
                 except Exception as e:
                     self.logger.error(f"Error fetching BMTC positions: {e}")
             
             # Get real-time metro positions
             if hasattr(self, 'bmrcl_fetcher') and self.bmrcl_fetcher:
                 try:
-                    metro_data = self.bmrcl_fetcher.fetch_live_positions()
+                    metro_data = self.bmrcl_fetcher.fetch_live_positions(limit=3)
                     if metro_data and 'entity' in metro_data and isinstance(metro_data['entity'], list):
-                        metro_positions = metro_data['entity']
-                        for metro in metro_positions[:3]:  # Limit to 3 metros for performance
-                            if isinstance(metro, dict) and 'vehicle' in metro:
-                                vehicle_info = metro['vehicle']
-                                position = vehicle_info.get('position', {})
-                                vehicle_positions.append({
-                                    'type': 'metro',
-                                    'line': vehicle_info.get('trip', {}).get('route_id', 'Unknown'),
-                                    'vehicle_id': vehicle_info.get('vehicle', {}).get('id', 'Unknown'),
-                                    'lat': position.get('latitude', 12.9716),
-                                    'lng': position.get('longitude', 77.5946),
-                                    'speed': position.get('speed', 0),
-                                    'occupancy': vehicle_info.get('occupancy_status', 'medium'),
-                                    'current_station': vehicle_info.get('current_station', 'Unknown'),
-                                    'next_station': vehicle_info.get('next_station', 'Unknown')
-                                })
+                        metro_positions = (
+                            m for m in metro_data['entity'] if isinstance(m, dict) and 'vehicle' in m
+                        )
+                        for metro in itertools.islice(metro_positions, 3):  # Limit to 3 metros for performance
+                            vehicle_info = metro['vehicle']
+                            position = vehicle_info.get('position', {})
+                            vehicle_positions.append({
+                                'type': 'metro',
+                                'line': vehicle_info.get('trip', {}).get('route_id', 'Unknown'),
+                                'vehicle_id': vehicle_info.get('vehicle', {}).get('id', 'Unknown'),
+                                'lat': position.get('latitude', 12.9716),
+                                'lng': position.get('longitude', 77.5946),
+                                'speed': position.get('speed', 0),
+                                'occupancy': vehicle_info.get('occupancy_status', 'medium'),
+                                'current_station': vehicle_info.get('current_station', 'Unknown'),
+                                'next_station': vehicle_info.get('next_station', 'Unknown')
+                            })
                 except Exception as e:
                     self.logger.error(f"Error fetching BMRCL positions: {e}")
             
@@ -629,7 +874,7 @@ class PathwayTransitStreaming:
         """Wrapper method for web server compatibility - get nearest stops"""
         try:
             stops = self.find_nearest_stops(lat, lng, max_distance_km)
-            return [asdict(stop) for stop in stops]
+            return list(stops.to_rows())
         except Exception as e:
             self.logger.error(f"Error getting nearest stops: {e}")
             return []
@@ -638,24 +883,28 @@ class PathwayTransitStreaming:
                                  dest_lat: float, dest_lng: float) -> Dict[str, Any]:
         """Get comprehensive real-time updates for transport options"""
         try:
-            # Get real-time data from various sources
-            traffic_data = await self.fetch_real_time_traffic(source_lat, source_lng, 5)
-            taxi_data = await self.fetch_taxi_availability(source_lat, source_lng)
-            bus_schedules = await self.fetch_bus_schedules(source_lat, source_lng)
+            # Static stops are only needed when falling back from the live BMTC feed
+            bmtc_static = None if self.bmtc_fetcher else self._load_bmtc_static()
             
-            # Simulate real-time bus and metro updates
-            bus_updates = await self._get_realtime_bus_updates(source_lat, source_lng, dest_lat, dest_lng)
-            metro_updates = await self._get_realtime_metro_updates(source_lat, source_lng, dest_lat, dest_lng)
-            service_alerts = await self._get_service_alerts(source_lat, source_lng, dest_lat, dest_lng)
+            # Get real-time data and bus/metro/alert updates from all sources concurrently
+            (traffic_data, taxi_data, bus_schedules,
+             bus_updates, metro_updates, service_alerts) = await asyncio.gather(
+                self.fetch_real_time_traffic(source_lat, source_lng, 5),
+                self.fetch_taxi_availability(source_lat, source_lng),
+                self.fetch_bus_schedules(source_lat, source_lng, bmtc_static=bmtc_static),
+                self._get_realtime_bus_updates(source_lat, source_lng, dest_lat, dest_lng),
+                self._get_realtime_metro_updates(source_lat, source_lng, dest_lat, dest_lng),
+                self._get_service_alerts(source_lat, source_lng, dest_lat, dest_lng)
+            )
             
             updates = {
                 'buses': bus_updates,
                 'metros': metro_updates,
-                'traffic': [asdict(t) for t in traffic_data],
-                'taxi_availability': [asdict(t) for t in taxi_data],
-                'bus_schedules': [asdict(b) for b in bus_schedules],
+                'traffic': list(traffic_data.to_rows()),
+                'taxi_availability': list(taxi_data.to_rows()),
+                'bus_schedules': list(bus_schedules.to_rows()),
                 'alerts': service_alerts,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': self._now_iso()
             }
             
             return updates
@@ -672,35 +921,40 @@ class PathwayTransitStreaming:
             
             # Use real-time BMTC fetcher if available
             if hasattr(self, 'bmtc_fetcher') and self.bmtc_fetcher:
-                live_buses = await asyncio.to_thread(self.bmtc_fetcher.fetch_live_positions)
+                live_buses = _live_vehicles(await self._run_fetch(self.bmtc_fetcher.fetch_live_positions))
                 
-                for bus in live_buses:
-                    # Calculate distance from source
-                    distance_from_source = self._calculate_distance(
-                        source_lat, source_lng, bus['latitude'], bus['longitude']
-                    )
+                # Gather bus coordinates into contiguous arrays
+                count = len(live_buses)
+                lats = np.fromiter((b['position']['latitude'] for b in live_buses), dtype=np.float64, count=count)
+                lngs = np.fromiter((b['position']['longitude'] for b in live_buses), dtype=np.float64, count=count)
+                
+                # Only include buses within 5km of the route, keeping the 5 closest
+                indices, distances = self._points_within_radius(source_lat, source_lng, lats, lngs, 5.0)
+                nearest = heapq.nsmallest(5, zip(distances.tolist(), indices.tolist()))
+                for distance_from_source, idx in nearest:
+                    bus = live_buses[idx]
+                    position = bus['position']
+                    speed_kmh = position.get('speed', 0)
                     
-                    # Only include buses within 5km of the route
-                    if distance_from_source <= 5.0:
-                        # Estimate ETA based on distance and speed
-                        if bus['speed_kmh'] > 0:
-                            eta_minutes = int((distance_from_source / bus['speed_kmh']) * 60)
-                        else:
-                            eta_minutes = 5 + (hash(bus['vehicle_id']) % 15)
-                        
-                        bus_updates.append({
-                            'route_id': bus['route_id'],
-                            'vehicle_id': bus['vehicle_id'],
-                            'current_lat': bus['latitude'],
-                            'current_lng': bus['longitude'],
-                            'delay_minutes': bus.get('delay_minutes', 0),
-                            'next_stop': f"Stop near {bus['vehicle_id'][-3:]}",
-                            'eta_minutes': eta_minutes,
-                            'occupancy': bus.get('occupancy_status', 'MEDIUM').upper(),
-                            'speed_kmh': bus['speed_kmh']
-                        })
+                    # Estimate ETA based on distance and speed
+                    if speed_kmh > 0:
+                        eta_minutes = int((distance_from_source / speed_kmh) * 60)
+                    else:
+                        eta_minutes = _BUS_FALLBACK_ETA[ord(bus['vehicle_id'][-1]) & 0xFF]
+                    
+                    bus_updates.append({
+                        'route_id': bus['trip']['route_id'],
+                        'vehicle_id': bus['vehicle_id'],
+                        'current_lat': position['latitude'],
+                        'current_lng': position['longitude'],
+                        'delay_minutes': bus.get('delay_minutes', 0),
+                        'next_stop': _next_stop_label(bus['vehicle_id']),
+                        'eta_minutes': eta_minutes,
+                        'occupancy': bus.get('occupancy_status', 'MEDIUM').upper(),
+                        'speed_kmh': speed_kmh
+                    })
                 
-                return bus_updates[:5]  # Limit to 5 buses
+                return bus_updates
             else:
                 # Fallback to simulated data
                 bus_updates = [
@@ -740,37 +994,42 @@ class PathwayTransitStreaming:
             
             # Use real-time BMRCL fetcher if available
             if hasattr(self, 'bmrcl_fetcher') and self.bmrcl_fetcher:
-                live_metros = await asyncio.to_thread(self.bmrcl_fetcher.fetch_live_positions)
+                live_metros = _live_vehicles(await self._run_fetch(self.bmrcl_fetcher.fetch_live_positions))
                 
-                for metro in live_metros:
-                    # Calculate distance from source
-                    distance_from_source = self._calculate_distance(
-                        source_lat, source_lng, metro['latitude'], metro['longitude']
-                    )
+                # Gather train coordinates into contiguous arrays
+                count = len(live_metros)
+                lats = np.fromiter((m['position']['latitude'] for m in live_metros), dtype=np.float64, count=count)
+                lngs = np.fromiter((m['position']['longitude'] for m in live_metros), dtype=np.float64, count=count)
+                
+                # Only include metros within 10km of the route, keeping the 3 closest
+                indices, distances = self._points_within_radius(source_lat, source_lng, lats, lngs, 10.0)
+                nearest = heapq.nsmallest(3, zip(distances.tolist(), indices.tolist()))
+                for distance_from_source, idx in nearest:
+                    metro = live_metros[idx]
+                    position = metro['position']
+                    speed_kmh = position.get('speed', 0)
                     
-                    # Only include metros within 10km of the route
-                    if distance_from_source <= 10.0:
-                        # Estimate ETA based on distance and speed
-                        if metro['speed_kmh'] > 0:
-                            eta_minutes = int((distance_from_source / metro['speed_kmh']) * 60)
-                        else:
-                            eta_minutes = 3 + (hash(metro['vehicle_id']) % 10)
-                        
-                        metro_updates.append({
-                            'line': metro['route_id'],
-                            'train_id': metro['vehicle_id'],
-                            'current_station': metro.get('current_station', 'Unknown'),
-                            'next_station': metro.get('next_station', 'Unknown'),
-                            'delay_minutes': metro.get('delay_minutes', 0),
-                            'eta_minutes': eta_minutes,
-                            'direction': metro.get('direction', 'Unknown'),
-                            'occupancy': metro.get('occupancy_status', 'MEDIUM').upper(),
-                            'current_lat': metro['latitude'],
-                            'current_lng': metro['longitude'],
-                            'speed_kmh': metro['speed_kmh']
-                        })
+                    # Estimate ETA based on distance and speed
+                    if speed_kmh > 0:
+                        eta_minutes = int((distance_from_source / speed_kmh) * 60)
+                    else:
+                        eta_minutes = _METRO_FALLBACK_ETA[ord(metro['vehicle_id'][-1]) & 0xFF]
+                    
+                    metro_updates.append({
+                        'line': metro['trip']['route_id'],
+                        'train_id': metro['vehicle_id'],
+                        'current_station': metro.get('current_station', 'Unknown'),
+                        'next_station': metro.get('next_station', 'Unknown'),
+                        'delay_minutes': metro.get('delay_minutes', 0),
+                        'eta_minutes': eta_minutes,
+                        'direction': metro.get('direction', 'Unknown'),
+                        'occupancy': metro.get('occupancy_status', 'MEDIUM').upper(),
+                        'current_lat': position['latitude'],
+                        'current_lng': position['longitude'],
+                        'speed_kmh': speed_kmh
+                    })
                 
-                return metro_updates[:3]  # Limit to 3 metros
+                return metro_updates
             else:
                 # Fallback to simulated data
                 metro_updates = [
@@ -806,6 +1065,8 @@ class PathwayTransitStreaming:
                                 dest_lat: float, dest_lng: float) -> List[Dict[str, Any]]:
         """Get service alerts and disruptions"""
         try:
+            now = datetime.now()
+            
             # Simulate service alerts
             alerts = [
                 {
@@ -813,16 +1074,16 @@ class PathwayTransitStreaming:
                     'severity': 'MEDIUM',
                     'message': 'Heavy traffic on Hosur Road due to construction',
                     'affected_routes': ['BMTC_356E', 'BMTC_500D'],
-                    'start_time': (datetime.now() - timedelta(hours=2)).isoformat(),
-                    'estimated_end': (datetime.now() + timedelta(hours=1)).isoformat()
+                    'start_time': (now - timedelta(hours=2)).isoformat(),
+                    'estimated_end': (now + timedelta(hours=1)).isoformat()
                 },
                 {
                     'type': 'METRO',
                     'severity': 'LOW',
                     'message': 'Purple Line experiencing minor delays',
                     'affected_routes': ['Purple Line'],
-                    'start_time': (datetime.now() - timedelta(minutes=30)).isoformat(),
-                    'estimated_end': (datetime.now() + timedelta(minutes=15)).isoformat()
+                    'start_time': (now - timedelta(minutes=30)).isoformat(),
+                    'estimated_end': (now + timedelta(minutes=15)).isoformat()
                 }
             ]
             
@@ -837,29 +1098,31 @@ class PathwayTransitStreaming:
         """Generate mock vehicle position data for testing"""
         while True:
             try:
-                # Simulate vehicle positions for Bangalore routes
-                mock_vehicles = [
-                    VehiclePosition(
-                        vehicle_id=f"BUS_{i:03d}",
-                        route_id=f"ROUTE_{i % 10}",
-                        latitude=12.9716 + (0.01 * (i % 10)),
-                        longitude=77.5946 + (0.01 * (i % 10)),
-                        speed_kmh=25 + (i % 20),
-                        heading=i % 360,
-                        timestamp=datetime.now(),
-                        occupancy_status=["low", "medium", "high"][i % 3],
-                        next_stop_id=f"STOP_{i % 50}",
-                        delay_minutes=i % 10
-                    ) for i in range(20)
+                if self._mock_vehicles is None:
+                    self._init_mock_vehicles()
+                
+                timestamp = datetime.now().isoformat()
+                
+                # Convert to Pathway format in one batch from the columnar buffer
+                vehicle_rows = [
+                    {
+                        'vehicle_id': vehicle_id,
+                        'route_id': route_id,
+                        'latitude': lat,
+                        'longitude': lng,
+                        'speed_kmh': speed,
+                        'heading': heading,
+                        'timestamp': timestamp,
+                        'occupancy_status': occupancy,
+                        'next_stop_id': next_stop_id,
+                        'delay_minutes': delay
+                    }
+                    for (vehicle_id, route_id, occupancy, next_stop_id), (lat, lng, speed, heading, delay)
+                    in zip(self._mock_vehicle_ids, self._mock_vehicles.tolist())
                 ]
                 
-                # Convert to Pathway format and update table
-                for vehicle in mock_vehicles:
-                    vehicle_data = asdict(vehicle)
-                    vehicle_data['timestamp'] = vehicle_data['timestamp'].isoformat()
-                    
-                    # In a real implementation, you would update the Pathway table here
-                    # self.vehicle_table = self.vehicle_table.update_rows(...)
+                # In a real implementation, you would update the Pathway table here
+                # self.vehicle_table = self.vehicle_table.update_rows(vehicle_rows)
                 
                 await asyncio.sleep(30)  # Update every 30 seconds
                 
@@ -867,6 +1130,26 @@ class PathwayTransitStreaming:
                 self.logger.error(f"Error in mock vehicle stream: {e}")
                 await asyncio.sleep(5)
 
+    def _init_mock_vehicles(self, count: int = 20):
+        """Allocate the mock vehicle buffer as a NumPy structured array"""
+        i = np.arange(count)
+        mock = np.zeros(count, dtype=[
+            ('lat', 'f8'), ('lng', 'f8'), ('speed', 'f4'), ('heading', 'i4'), ('delay', 'i4')
+        ])
+        
+        # Simulate vehicle positions for Bangalore routes
+        mock['lat'] = 12.9716 + 0.01 * (i % 10)
+        mock['lng'] = 77.5946 + 0.01 * (i % 10)
+        mock['speed'] = 25 + (i % 20)
+        mock['heading'] = i % 360
+        mock['delay'] = i % 10
+        
+        self._mock_vehicles = mock
+        self._mock_vehicle_ids = [
+            (f"BUS_{k:03d}", f"ROUTE_{k % 10}", ["low", "medium", "high"][k % 3], f"STOP_{k % 50}")
+            for k in range(count)
+        ]
+
     @performance_monitor
     async def process_vehicle_stream(self, vehicle_data: Dict[str, Any]):
         """Process incoming vehicle position data"""
@@ -881,7 +1164,7 @@ class PathwayTransitStreaming:
             # Broadcast to WebSocket clients
             await self.broadcast_update({
                 "type": "vehicle_update",
-                "data": asdict(vehicle)
+                "data": vehicle.to_dict()
             })
             
         except Exception as e:
@@ -890,20 +1173,21 @@ class PathwayTransitStreaming:
     async def broadcast_update(self, data: Dict[str, Any]):
         """Broadcast updates to all connected WebSocket clients"""
         if self.websocket_clients:
-            message = json.dumps(data, default=str)
-            disconnected_clients = set()
-            
-            for client in self.websocket_clients:
-                try:
-                    await client.send(message)
-                except websockets.exceptions.ConnectionClosed:
-                    disconnected_clients.add(client)
-                except Exception as e:
-                    self.logger.error(f"Error broadcasting to client: {e}")
-                    disconnected_clients.add(client)
+            # Encode once with orjson; decoded so clients still receive text frames
+            message = orjson.dumps(data, default=str).decode('utf-8')
+            # Send to all clients concurrently so one slow client doesn't delay the rest
+            clients = tuple(self.websocket_clients)
+            results = await asyncio.gather(
+                *(client.send(message) for client in clients),
+                return_exceptions=True
+            )
             
             # Remove disconnected clients
-            self.websocket_clients -= disconnected_clients
+            for client, result in zip(clients, results):
+                if isinstance(result, Exception):
+                    if not isinstance(result, websockets.exceptions.ConnectionClosed):
+                        self.logger.error(f"Error broadcasting to client: {result}")
+                    self.websocket_clients.discard(client)
 
     async def handle_websocket_client(self, websocket, path):
         """Handle WebSocket client connections"""
@@ -941,7 +1225,7 @@ class PathwayTransitStreaming:
                     segment['traffic_delay_minutes'] = traffic_delay
                     segment['adjusted_duration'] = segment.get('duration', 0) + traffic_delay
             
-            enhanced_route['last_updated'] = datetime.now().isoformat()
+            enhanced_route['last_updated'] = self._now_iso()
             return enhanced_route
             
         except Exception as e:
@@ -957,7 +1241,7 @@ class PathwayTransitStreaming:
             
             if traffic_data:
                 # Calculate average delay
-                total_delay = sum(t.estimated_delay_minutes for t in traffic_data)
+                total_delay = int(traffic_data.column('estimated_delay_minutes').sum())
                 return total_delay // len(traffic_data)
             
             return 0
@@ -3,11 +3,13 @@ Kafka Producer for Bangalore Transit Data Pipeline
 Reads JSON files and publishes data to Kafka topics
 """
 
-import json
+import functools
+import os
 import time
 import sys
 from pathlib import Path
 from typing import Dict, Any, Optional
+import orjson
 from kafka import KafkaProducer
 from kafka.errors import KafkaError
 
@@ -23,12 +25,52 @@ from utils.common import (
     format_message_key, validate_kafka_message
 )
 
+@functools.lru_cache(maxsize=16)
+def _load_static_bytes(file_path: str, mtime: float) -> Optional[bytes]:
+    """
+    Load and pre-serialize a static JSON file
+    
+    Cached by path and modification time, so unchanged files are neither
+    re-read nor re-encoded on subsequent publishes.
+    """
+    data = load_json_file(file_path)
+    if not data:
+        return None
+    return orjson.dumps(data)
+
+def load_static_payload(file_path: str) -> Optional[orjson.Fragment]:
+    """
+    Get a static JSON file as a pre-serialized orjson fragment
+    
+    Args:
+        file_path: Path to JSON file, relative to the project root
+        
+    Returns:
+        Fragment that embeds the cached bytes when the message is serialized,
+        or None if the file could not be loaded
+    """
+    try:
+        mtime = os.path.getmtime(project_root / file_path)
+    except OSError:
+        mtime = 0.0
+    cached = _load_static_bytes(file_path, mtime)
+    return orjson.Fragment(cached) if cached is not None else None
+
 class BangaloreTransitProducer:
     """Kafka producer for Bangalore transit data"""
     
     def __init__(self):
         self.logger = setup_logging(__name__)
         self.producer = None
+        
+        # Delivery counters updated from the producer's send callbacks
+        self.delivered_count = 0
+        self.failed_count = 0
+        
+        # Encoded message keys per (agency, entity_id); the entity set is
+        # stable across ticks, so keys are formatted and encoded only once
+        self._key_cache: Dict[tuple, bytes] = {}
+        
         self.connect_to_kafka()
     
     def connect_to_kafka(self):
@@ -40,23 +82,43 @@ class BangaloreTransitProducer:
             self.logger.error(f"Failed to connect to Kafka: {e}")
             raise
     
-    def publish_message(self, topic: str, key: str, message: Dict[Any, Any]) -> bool:
+    def _on_send_success(self, record_metadata):
+        """Callback for successfully delivered messages"""
+        self.delivered_count += 1
+        self.logger.info(
+            f"Message sent to topic: {record_metadata.topic}, "
+            f"partition: {record_metadata.partition}, "
+            f"offset: {record_metadata.offset}"
+        )
+    
+    def _on_send_error(self, exc):
+        """Errback for messages that failed to deliver"""
+        self.failed_count += 1
+        self.logger.error(f"Kafka error sending message: {exc}")
+    
+    def publish_message(self, topic: str, key: bytes, message: Dict[Any, Any],
+                        timestamp: Optional[int] = None) -> bool:
         """
         Publish message to Kafka topic
         
+        The send is asynchronous: delivery is reported through the send
+        callbacks, and callers that need confirmation should flush the producer.
+        
         Args:
             topic: Kafka topic name
             key: Message key
             message: Message payload
+            timestamp: Pipeline timestamp to stamp on the message; taken from
+                the clock when omitted
             
         Returns:
-            True if successful, False otherwise
+            True if the message was queued, False otherwise
         """
         try:
             # Add metadata to message
             enriched_message = {
                 **message,
-                'pipeline_timestamp': get_current_timestamp(),
+                'pipeline_timestamp': timestamp if timestamp is not None else get_current_timestamp(),
                 'source': 'bangalore_transit_pipeline'
             }
             
@@ -65,25 +127,15 @@ class BangaloreTransitProducer:
                 self.logger.warning(f"Invalid message structure for key: {key}")
                 return False
             
-            # Serialize message
-            message_json = json.dumps(enriched_message, ensure_ascii=False)
-            
-            # Send message
+            # Send message without blocking on the broker round-trip;
+            # the producer's value_serializer encodes the dict with orjson
             future = self.producer.send(
                 topic=topic,
                 key=key,
-                value=message_json
-            )
-            
-            # Wait for confirmation
-            record_metadata = future.get(timeout=10)
-            
-            self.logger.info(
-                f"Message sent to topic: {record_metadata.topic}, "
-                f"partition: {record_metadata.partition}, "
-                f"offset: {record_metadata.offset}, "
-                f"key: {key}"
+                value=enriched_message
             )
+            future.add_callback(self._on_send_success)
+            future.add_errback(self._on_send_error)
             
             return True
             
@@ -105,11 +157,11 @@ class BangaloreTransitProducer:
             True if successful, False otherwise
         """
         try:
-            # Load static data
+            # Load static data (cached pre-serialized bytes)
             static_file_path = DATA_PATHS['static'][agency]
-            static_data = load_json_file(static_file_path)
+            static_data = load_static_payload(static_file_path)
             
-            if not static_data:
+            if static_data is None:
                 self.logger.error(f"Failed to load static data for {agency}")
                 return False
             
@@ -147,11 +199,11 @@ class BangaloreTransitProducer:
             True if successful, False otherwise
         """
         try:
-            # Load fare data
+            # Load fare data (cached pre-serialized bytes)
             fare_file_path = DATA_PATHS['fares'][agency]
-            fare_data = load_json_file(fare_file_path)
+            fare_data = load_static_payload(fare_file_path)
             
-            if not fare_data:
+            if fare_data is None:
                 self.logger.error(f"Failed to load fare data for {agency}")
                 return False
             
@@ -209,32 +261,50 @@ class BangaloreTransitProducer:
                 self.logger.error(f"Failed to load position data for {agency}")
                 return False
             
-            # Update timestamp to current time
-            position_data['header']['timestamp'] = get_current_timestamp()
+            # Stamp the whole batch with a single timestamp
+            ts = get_current_timestamp()
+            position_data['header']['timestamp'] = ts
+            
+            # Every message in the batch shares the same envelope; it always
+            # carries the required fields, so per-entity validation is skipped
+            base = {
+                'timestamp': ts,
+                'agency': agency,
+                'data_type': position_type,
+                'pipeline_timestamp': ts,
+                'source': 'bangalore_transit_pipeline'
+            }
+            send = self.producer.send
+            key_cache = self._key_cache
             
             # Publish each vehicle/train position separately
-            success_count = 0
-            total_entities = len(position_data.get('entity', []))
+            delivered_before = self.delivered_count
+            entities = position_data.get('entity', [])
+            total_entities = len(entities)
             
-            for entity in position_data.get('entity', []):
+            for entity in entities:
                 # Update entity timestamp
                 if 'vehicle' in entity and 'timestamp' in entity['vehicle']:
-                    entity['vehicle']['timestamp'] = get_current_timestamp()
-                
-                # Prepare message
-                message = {
-                    'timestamp': get_current_timestamp(),
-                    'agency': agency,
-                    'data_type': position_type,
-                    'entity': entity
-                }
+                    entity['vehicle']['timestamp'] = ts
                 
                 # Create unique key for each vehicle/train
                 entity_id = entity.get('id', 'unknown')
-                key = format_message_key(agency, 'positions', entity_id)
+                key = key_cache.get((agency, entity_id))
+                if key is None:
+                    key = format_message_key(agency, 'positions', entity_id)
+                    key_cache[(agency, entity_id)] = key
                 
-                if self.publish_message(topic, key, message):
-                    success_count += 1
+                try:
+                    future = send(topic, key=key, value={**base, 'entity': entity})
+                except KafkaError as e:
+                    self.logger.error(f"Kafka error sending message: {e}")
+                    continue
+                future.add_callback(self._on_send_success)
+                future.add_errback(self._on_send_error)
+            
+            # Wait once for the whole batch instead of per message
+            self.producer.flush()
+            success_count = self.delivered_count - delivered_before
             
             self.logger.info(
                 f"Published {success_count}/{total_entities} position updates for {agency}"
@@ -249,6 +319,7 @@ class BangaloreTransitProducer:
     def publish_all_static_data(self) -> bool:
         """Publish all static data for both agencies"""
         success = True
+        failed_before = self.failed_count
         
         for agency in ['bmtc', 'bmrcl']:
             if not self.publish_static_data(agency):
@@ -256,6 +327,14 @@ class BangaloreTransitProducer:
             if not self.publish_fare_data(agency):
                 success = False
         
+        # Sends are only queued above; wait for delivery and count failures
+        self.producer.flush()
+        if self.failed_count > failed_before:
+            self.logger.error(
+                f"{self.failed_count - failed_before} static data messages failed to deliver"
+            )
+            success = False
+        
         return success
     
     def start_live_data_simulation(self, interval_seconds: int = 30):
@@ -268,13 +347,20 @@ class BangaloreTransitProducer:
         self.logger.info(f"Starting live data simulation with {interval_seconds}s intervals")
         
         try:
+            # Schedule against a monotonic deadline so publish time doesn't cause drift
+            next_tick = time.monotonic()
+            
             while True:
+                next_tick += interval_seconds
+                
                 # Publish vehicle positions for both agencies
                 self.publish_vehicle_positions('bmtc')
                 self.publish_vehicle_positions('bmrcl')
                 
-                self.logger.info(f"Waiting {interval_seconds} seconds for next update...")
-                time.sleep(interval_seconds)
+                sleep_for = next_tick - time.monotonic()
+                if sleep_for > 0:
+                    self.logger.info(f"Waiting {sleep_for:.1f} seconds for next update...")
+                    time.sleep(sleep_for)
                 
         except KeyboardInterrupt:
             self.logger.info("Live data simulation stopped by user")
@@ -9,10 +9,28 @@ import os
 import json
 from typing import Dict, List, Any
 
+import numpy as np
+
 # Add the utils directory to the path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
+_utils_dir = os.path.join(os.path.dirname(__file__), 'utils')
+if _utils_dir not in sys.path:
+    sys.path.append(_utils_dir)
 
 from enhanced_distance_calculator import EnhancedDistanceCalculator, PathSegment
+from utils.common import validate_kafka_messages
+
+# Fixture paths, built once at import
+COORDS_BCR_KIA = np.array([
+    [12.9762, 77.6033],  # Bangalore City Railway Station
+    [13.0827, 77.6500],  # Intermediate point
+    [13.1986, 77.7066]   # Kempegowda International Airport
+], dtype=np.float64)
+
+COORDS_MG_ROAD_BCR = np.array([
+    [12.9716, 77.5946],  # MG Road
+    [12.9759, 77.6013],  # Trinity Metro Station
+    [12.9762, 77.6033]   # Bangalore City Railway Station
+], dtype=np.float64)
 
 # Try to import routing service, but handle gracefully if it fails
 try:
@@ -42,18 +60,13 @@ def test_basic_distance_calculation():
     print(f"Geodesic distance: {geodesic_dist:.2f} km")
     
     # Test path distance calculation
-    coordinates = [
-        [start_lat, start_lon],
-        [13.0827, 77.6500],  # Intermediate point
-        [end_lat, end_lon]
-    ]
-    
-    path_analysis = calculator.calculate_path_distance(coordinates, transport_mode='driving')
+    path_analysis = calculator.calculate_path_distance(COORDS_BCR_KIA, transport_mode='driving')
     print(f"Path distance: {path_analysis.total_distance_km:.2f} km")
     print(f"Number of segments: {len(path_analysis.segments)}")
     print(f"Estimated accuracy: {path_analysis.estimated_accuracy:.2f}")
     
-    return path_analysis
+    assert path_analysis.total_distance_km > 0
+    assert len(path_analysis.segments) == len(COORDS_BCR_KIA) - 1
 
 def test_multi_modal_route():
     """Test multi-modal route distance calculation"""
@@ -100,7 +113,8 @@ def test_multi_modal_route():
     for mode, distance in multi_modal_analysis['distance_by_mode'].items():
         print(f"  {mode}: {distance:.2f} km")
     
-    return multi_modal_analysis
+    assert multi_modal_analysis['number_of_modes'] == len(route_segments)
+    assert multi_modal_analysis['total_distance_km'] > 0
 
 def test_routing_service_integration():
     """Test integration with the enhanced routing service"""
@@ -154,19 +168,12 @@ def test_distance_validation():
     
     calculator = EnhancedDistanceCalculator()
     
-    # Sample route data
-    coordinates = [
-        [12.9716, 77.5946],  # MG Road
-        [12.9759, 77.6013],  # Trinity Metro Station
-        [12.9762, 77.6033]   # Bangalore City Railway Station
-    ]
-    
     calculated_distance = 2.5  # km
     api_distance = 2.3  # km (simulated API response)
     
     validation_result = calculator.validate_distance_calculation(
         calculated_distance=calculated_distance,
-        geometry=coordinates,
+        geometry=COORDS_MG_ROAD_BCR,
         transport_mode='walking',
         expected_duration_minutes=5.0  # Estimated 5 minutes for walking
     )
@@ -222,6 +229,24 @@ def test_route_efficiency_and_optimization():
         if fare > 0:
             print(f"    {mode}: ₹{fare:.2f}")
 
+def test_kafka_message_validation():
+    """Test batch validation of Kafka messages, including malformed records"""
+    print("\n=== Testing Kafka Message Validation ===")
+    
+    good = {'timestamp': '2024-01-01T00:00:00', 'agency': 'BMTC', 'data_type': 'fares'}
+    messages = [
+        good,
+        None,                           # JSON null record
+        [1, 2, 3],                      # non-dict record
+        42,                             # non-dict record
+        {**good, 'timestamp': None},    # required field present but null
+        {'agency': 'BMTC', 'data_type': 'fares'},
+    ]
+    
+    valid = validate_kafka_messages(messages)
+    print(f"Validation results: {valid.tolist()}")
+    assert valid.tolist() == [True, False, False, False, False, False]
+
 def main():
     """Run all distance calculation tests"""
     print("Enhanced Distance Calculation Test Suite")
@@ -234,6 +259,7 @@ def main():
         test_routing_service_integration()
         test_distance_validation()
         test_route_efficiency_and_optimization()
+        test_kafka_message_validation()
         
         print("\n" + "=" * 50)
         print("All tests completed successfully!")
@@ -2,27 +2,87 @@
 Common utilities for Bangalore Transit Data Pipeline
 """
 
+import functools
 import json
 import logging
 import logging.config
-import os
+import math
+import mmap
 import sys
-from datetime import datetime
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+import numpy as np
+
+try:
+    import orjson
+    
+    def _json_loads(raw):
+        return orjson.loads(raw)
+    
+    def _json_dumps(data, pretty: bool = False) -> bytes:
+        if pretty:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    def _json_loads(raw):
+        return json.loads(bytes(raw))
+    
+    def _json_dumps(data, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    
+    _JSONDecodeError = json.JSONDecodeError
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Without numba the kernels below run as plain Python
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import fastjsonschema
+    FASTJSONSCHEMA_AVAILABLE = True
+except ImportError:
+    FASTJSONSCHEMA_AVAILABLE = False
+
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
-sys.path.append(str(project_root))
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+_PROJECT_ROOT = project_root.resolve()
 
-from config.kafka_config import LOGGING_CONFIG
+@functools.lru_cache(maxsize=1)
+def _configure_logging():
+    """Apply the pipeline logging configuration once per process"""
+    # Imported here so modules that only need the helpers below do not
+    # pay for the Kafka config import or touch the filesystem
+    from config.kafka_config import LOGGING_CONFIG
+    
+    ensure_logs_directory()
+    logging.config.dictConfig(LOGGING_CONFIG)
 
 def setup_logging(name: str) -> logging.Logger:
     """Setup logging configuration"""
-    logging.config.dictConfig(LOGGING_CONFIG)
+    _configure_logging()
     logger = logging.getLogger(name)
     return logger
 
+def _resolve(file_path) -> Path:
+    """Resolve a path relative to the project root unless it is absolute"""
+    file_path = Path(file_path)
+    return file_path if file_path.is_absolute() else _PROJECT_ROOT / file_path
+
 def load_json_file(file_path: str) -> Optional[Dict[Any, Any]]:
     """
     Load JSON data from file with error handling
@@ -34,54 +94,61 @@ def load_json_file(file_path: str) -> Optional[Dict[Any, Any]]:
         Dictionary containing JSON data or None if error
     """
     try:
-        # Convert relative path to absolute path
-        if not os.path.isabs(file_path):
-            file_path = os.path.join(project_root, file_path)
-            
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
+        file_path = _resolve(file_path)
+        
+        # Parse straight from the page cache instead of copying the file
+        # into a bytes object first
+        with open(file_path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    data = _json_loads(view)
             return data
     except FileNotFoundError:
-        logging.error(f"File not found: {file_path}")
+        logging.error("File not found: %s", file_path)
         return None
-    except json.JSONDecodeError as e:
-        logging.error(f"JSON decode error in {file_path}: {e}")
+    except _JSONDecodeError as e:
+        logging.error("JSON decode error in %s: %s", file_path, e)
         return None
     except Exception as e:
-        logging.error(f"Error loading {file_path}: {e}")
+        logging.error("Error loading %s: %s", file_path, e)
         return None
 
-def save_json_file(data: Dict[Any, Any], file_path: str) -> bool:
+def save_json_file(data: Dict[Any, Any], file_path: str, pretty: bool = False) -> bool:
     """
     Save data to JSON file with error handling
     
     Args:
         data: Dictionary to save
         file_path: Path to save file
+        pretty: Indent the output for human reading; compact by default
         
     Returns:
         True if successful, False otherwise
     """
     try:
-        # Convert relative path to absolute path
-        if not os.path.isabs(file_path):
-            file_path = os.path.join(project_root, file_path)
-            
+        file_path = _resolve(file_path)
+        
         # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(file_path, 'w', encoding='utf-8') as file:
-            json.dump(data, file, indent=2, ensure_ascii=False)
+        payload = _json_dumps(data, pretty)
+        with open(file_path, 'wb') as file:
+            file.write(payload)
             return True
     except Exception as e:
-        logging.error(f"Error saving {file_path}: {e}")
+        logging.error("Error saving %s: %s", file_path, e)
         return False
 
 def get_current_timestamp() -> int:
     """Get current timestamp in seconds"""
-    return int(datetime.now().timestamp())
+    return int(time.time())
+
+@functools.lru_cache(maxsize=64)
+def _message_key_prefix(agency: str, data_type: str) -> bytes:
+    """Encoded key prefix for an agency/data type pair"""
+    return f"{agency}_{data_type}".encode('utf-8')
 
-def format_message_key(agency: str, data_type: str, entity_id: str = None) -> str:
+def format_message_key(agency: str, data_type: str, entity_id: str = None) -> bytes:
     """
     Format Kafka message key
     
@@ -91,11 +158,22 @@ def format_message_key(agency: str, data_type: str, entity_id: str = None) -> st
         entity_id: Optional entity identifier
         
     Returns:
-        Formatted key string
+        Encoded key bytes, ready to hand to the producer
     """
+    prefix = _message_key_prefix(agency, data_type)
     if entity_id:
-        return f"{agency}_{data_type}_{entity_id}"
-    return f"{agency}_{data_type}"
+        return b"_".join((prefix, str(entity_id).encode('utf-8')))
+    return prefix
+
+KAFKA_MESSAGE_REQUIRED_FIELDS = ('timestamp', 'agency', 'data_type')
+
+if FASTJSONSCHEMA_AVAILABLE:
+    _kafka_message_validator = fastjsonschema.compile({
+        'type': 'object',
+        'required': list(KAFKA_MESSAGE_REQUIRED_FIELDS)
+    })
+else:
+    _kafka_message_validator = None
 
 def validate_kafka_message(message: Dict[Any, Any]) -> bool:
     """
@@ -107,19 +185,53 @@ def validate_kafka_message(message: Dict[Any, Any]) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    required_fields = ['timestamp', 'agency', 'data_type']
+    if _kafka_message_validator is not None:
+        try:
+            _kafka_message_validator(message)
+            return True
+        except fastjsonschema.JsonSchemaException as e:
+            logging.warning("Invalid Kafka message: %s", e.message)
+            return False
     
-    for field in required_fields:
+    for field in KAFKA_MESSAGE_REQUIRED_FIELDS:
         if field not in message:
-            logging.warning(f"Missing required field: {field}")
+            logging.warning("Missing required field: %s", field)
             return False
     
     return True
 
+def validate_kafka_messages(messages: List[Dict[Any, Any]]) -> np.ndarray:
+    """
+    Validate a batch of Kafka messages
+    
+    Args:
+        messages: Message dictionaries, e.g. one consumer poll
+        
+    Returns:
+        Boolean array, True where the message is a dict with every required
+        field present and not None
+    """
+    count = len(messages)
+    valid = np.ones(count, dtype=bool)
+    for field in KAFKA_MESSAGE_REQUIRED_FIELDS:
+        valid &= np.fromiter(
+            (isinstance(m, dict) and m.get(field) is not None for m in messages),
+            dtype=bool, count=count,
+        )
+    
+    invalid = count - int(valid.sum())
+    if invalid:
+        logging.warning("%d/%d messages missing required fields", invalid, count)
+    
+    return valid
+
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculate distance between two coordinates using Haversine formula
     
+    Coordinates are rounded to 6 decimals (about 11 cm) and the pair is put
+    in a canonical order, so repeated and reversed queries hit the cache.
+    
     Args:
         lat1, lon1: First coordinate
         lat2, lon2: Second coordinate
@@ -127,26 +239,85 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     Returns:
         Distance in kilometers
     """
-    import math
-    
+    a = (round(lat1, 6), round(lon1, 6))
+    b = (round(lat2, 6), round(lon2, 6))
+    if a == b:
+        return 0.0
+    if b < a:
+        a, b = b, a
+    return _cached_distance(a[0], a[1], b[0], b[1])
+
+@functools.lru_cache(maxsize=100_000)
+def _cached_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Haversine distance for a canonicalized coordinate pair"""
     # Convert latitude and longitude from degrees to radians
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
+    lat1 = math.radians(lat1)
+    lat2 = math.radians(lat2)
     dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
+    dlon = math.radians(lon2 - lon1)
+    
+    # Below ~600 m the planar small-angle approximation is accurate to
+    # well under a metre and skips the inverse trig call
+    if abs(dlat) + abs(dlon) < 1e-4:
+        return math.hypot(dlat, math.cos(lat1) * dlon) * 6371.0
+    
+    # Haversine formula; atan2 stays stable as a approaches 1 (antipodes)
+    sin_half_dlat = math.sin(dlat * 0.5)
+    sin_half_dlon = math.sin(dlon * 0.5)
+    a = (sin_half_dlat * sin_half_dlat
+         + math.cos(lat1) * math.cos(lat2) * sin_half_dlon * sin_half_dlon)
+    c = 2.0 * math.atan2(math.sqrt(a), math.sqrt(1.0 - a))
     
     # Radius of earth in kilometers
-    r = 6371
+    return c * 6371.0
+
+@njit(fastmath=True, cache=True, nogil=True)
+def calculate_distance_nb(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Haversine distance in kilometers, compiled with numba when available"""
+    deg2rad = math.pi / 180.0
+    lat1 = lat1 * deg2rad
+    lat2 = lat2 * deg2rad
+    dlat = lat2 - lat1
+    dlon = (lon2 - lon1) * deg2rad
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(a))
+
+def precompute_geopoints(coords) -> Dict[str, np.ndarray]:
+    """
+    Precompute per-point trig terms for repeated distance evaluations
     
-    return c * r
+    Args:
+        coords: Sequence or array of [lat, lon] rows in degrees
+        
+    Returns:
+        Struct-of-arrays dict with lat_rad, lon_rad and cos_lat
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    lat_rad = np.radians(coords[:, 0])
+    lon_rad = np.radians(coords[:, 1])
+    return {
+        'lat_rad': lat_rad,
+        'lon_rad': lon_rad,
+        'cos_lat': np.cos(lat_rad),
+    }
+
+def segment_distances_precomputed(points: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Haversine lengths of consecutive segments between precomputed points
+    
+    Args:
+        points: Output of precompute_geopoints
+        
+    Returns:
+        Array of N-1 segment distances in kilometers
+    """
+    lat_rad = points['lat_rad']
+    lon_rad = points['lon_rad']
+    cos_lat = points['cos_lat']
+    a = (np.sin(np.diff(lat_rad) / 2) ** 2
+         + cos_lat[:-1] * cos_lat[1:] * np.sin(np.diff(lon_rad) / 2) ** 2)
+    return 2 * 6371.0 * np.arcsin(np.sqrt(a))
 
 def ensure_logs_directory():
     """Ensure logs directory exists"""
-    logs_dir = os.path.join(project_root, 'logs')
-    os.makedirs(logs_dir, exist_ok=True)
-
-# Initialize logs directory when module is imported
-ensure_logs_directory()
\ No newline at end of file
+    (_PROJECT_ROOT / 'logs').mkdir(parents=True, exist_ok=True)
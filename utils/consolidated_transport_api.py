@@ -7,14 +7,24 @@ Includes automatic fallback handling and real-time data integration
 
 import os
 import json
+import time
 import logging
+import threading
 import asyncio
+import traceback
+import itertools
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field, asdict, replace
 from datetime import datetime, timedelta
 from enum import Enum
 
-from .common import setup_logging
+import numpy as np
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+
+from .common import setup_logging, calculate_distance_nb
 from .error_handler import error_handler_decorator, performance_monitor
 from .transport_integration_agent import TransportIntegrationAgent
 from .fallback_routing_providers import FallbackRoutingManager, RoutePoint
@@ -23,6 +33,24 @@ from .data_freshness_validator import DataFreshnessValidator, DataSource
 
 logger = setup_logging("consolidated_transport_api")
 
+# Responses are reused for queries within ~100 m of each other (3 decimal
+# places) during the same minute
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL_SECONDS = 60
+
+# Freshness probes are shared by requests arriving within this window
+FRESHNESS_REPORT_TTL_SECONDS = 15
+
+# Per-provider time budgets (seconds) so one slow upstream cannot hold up
+# the whole response
+PROVIDER_TIMEOUTS = {
+    'bmtc': 1.5,
+    'metro': 1.5,
+    'taxi': 3.0,
+    'walking_cycling': 0.1,
+    'pathway': 2.0
+}
+
 class TransportMode(Enum):
     """Transport mode enumeration"""
     BMTC_REGULAR = "bmtc_regular"
@@ -37,7 +65,23 @@ class TransportMode(Enum):
     WALKING = "walking"
     CYCLING = "cycling"
 
-@dataclass
+# Taxi vehicle types (lowercase) to transport modes
+_TAXI_MODE_MAP = {
+    'auto': TransportMode.TAXI_AUTO,
+    'mini': TransportMode.TAXI_MINI,
+    'sedan': TransportMode.TAXI_SEDAN,
+    'suv': TransportMode.TAXI_SUV,
+    'bike': TransportMode.TAXI_BIKE
+}
+
+# BMTC bus types as (mode, display name, lowercase name for live data matching)
+_BMTC_BUS_TYPES = (
+    (TransportMode.BMTC_REGULAR, 'Regular', 'regular'),
+    (TransportMode.BMTC_AC, 'AC', 'ac'),
+    (TransportMode.BMTC_VOLVO, 'Volvo', 'volvo')
+)
+
+@dataclass(slots=True)
 class TransportOption:
     """Unified transport option with cost, ETA, and availability"""
     mode: TransportMode
@@ -50,18 +94,18 @@ class TransportOption:
     confidence_score: float  # 0-1, how reliable this data is
     
     # Additional details
-    stops: List[str] = None
+    stops: Optional[List[str]] = None
     vehicle_number: Optional[str] = None
     route_number: Optional[str] = None
     surge_multiplier: float = 1.0
     booking_fee: float = 0.0
     
     # Metadata
-    last_updated: datetime = None
+    last_updated: Optional[datetime] = None
     data_source: str = "live"  # 'live', 'cached', 'estimated'
     fallback_used: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class ConsolidatedTransportResponse:
     """Complete response with all transport options"""
     source_lat: float
@@ -72,7 +116,7 @@ class ConsolidatedTransportResponse:
     dest_name: Optional[str] = None
     
     # All available options sorted by preference
-    options: List[TransportOption] = None
+    options: List[TransportOption] = field(default_factory=list)
     
     # Quick access to best options
     cheapest_option: Optional[TransportOption] = None
@@ -84,21 +128,118 @@ class ConsolidatedTransportResponse:
     timestamp: datetime = None
     response_time_ms: float = 0.0
     data_freshness_score: float = 0.0
-    fallback_providers_used: List[str] = None
+    fallback_providers_used: List[str] = field(default_factory=list)
     
     # Alternatives if main services fail
     alternatives_available: bool = True
     service_status: Dict[str, str] = None
     pathway_realtime: Optional[Dict[str, Any]] = None
+    
+    def to_json_bytes(self) -> bytes:
+        """
+        Serialize the full response to JSON
+        
+        orjson walks the dataclasses, enums and datetimes natively instead of
+        deep-copying through asdict; anything else in the real-time payload
+        falls back to str().
+        """
+        return orjson.dumps(self, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+# Compact integer ids for transport modes in TransportOptionTable
+_MODE_IDS = {mode: i for i, mode in enumerate(TransportMode)}
+
+# Modes that get the public transport bonus in the recommendation score
+_PUBLIC_MODE_IDS = np.array([_MODE_IDS[TransportMode.BMTC_REGULAR],
+                             _MODE_IDS[TransportMode.BMTC_AC],
+                             _MODE_IDS[TransportMode.METRO]], dtype=np.int8)
+
+class TransportOptionTable:
+    """
+    Columnar view of the fields used to rank transport options
+    
+    The option objects are kept alongside parallel NumPy columns so scoring
+    and best-of selection run over contiguous arrays.
+    """
+    
+    def __init__(self, options: List[TransportOption]):
+        count = len(options)
+        self.options = options
+        self.mode_ids = np.fromiter((_MODE_IDS[o.mode] for o in options), dtype=np.int8, count=count)
+        self.cost = np.fromiter((o.cost_inr for o in options), dtype=np.float64, count=count)
+        self.time = np.fromiter((o.travel_time_minutes for o in options), dtype=np.int64, count=count)
+        self.avail = np.fromiter((o.next_availability_minutes for o in options), dtype=np.int64, count=count)
+        self.conf = np.fromiter((o.confidence_score for o in options), dtype=np.float64, count=count)
+    
+    def __len__(self) -> int:
+        return len(self.options)
+    
+    def take(self, indices: np.ndarray) -> 'TransportOptionTable':
+        """Return a new table with rows reordered or selected by index"""
+        table = TransportOptionTable.__new__(TransportOptionTable)
+        table.options = [self.options[i] for i in indices.tolist()]
+        table.mode_ids = self.mode_ids[indices]
+        table.cost = self.cost[indices]
+        table.time = self.time[indices]
+        table.avail = self.avail[indices]
+        table.conf = self.conf[indices]
+        return table
+    
+    def composite_scores(self) -> np.ndarray:
+        """Composite cost/time/availability/confidence score; lower is better"""
+        cost_score = self.cost / 100.0  # Normalize to 0-1 range
+        time_score = (self.time + self.avail) / 60.0
+        availability_score = self.avail / 30.0
+        confidence_penalty = (1.0 - self.conf) * 0.5
+        
+        return (cost_score * 0.3 + 
+                time_score * 0.4 + 
+                availability_score * 0.2 + 
+                confidence_penalty * 0.1)
+    
+    def sorted_by_score(self) -> 'TransportOptionTable':
+        """Return the table ordered by composite score, keeping ties in order"""
+        return self.take(np.argsort(self.composite_scores(), kind='stable'))
+    
+    def cheapest(self) -> TransportOption:
+        return self.options[int(np.argmin(self.cost))]
+    
+    def fastest(self) -> TransportOption:
+        return self.options[int(np.argmin(self.time + self.avail))]
+    
+    def most_available(self) -> TransportOption:
+        return self.options[int(np.argmin(self.avail))]
+    
+    def recommendation_scores(self) -> np.ndarray:
+        """Tiered recommendation score per option; higher is better"""
+        conf, cost, avail = self.conf, self.cost, self.avail
+        total = self.time + avail
+        
+        # Prefer reliable data, faster and cheaper trips, short waits and
+        # public transport; each tier is a boolean mask times its points
+        return ((conf > 0.8) * 20 + ((conf > 0.6) & (conf <= 0.8)) * 10 +
+                (total < 30) * 15 + ((total >= 30) & (total < 60)) * 10 +
+                (cost < 50) * 15 + ((cost >= 50) & (cost < 100)) * 10 +
+                (avail < 5) * 10 + ((avail >= 5) & (avail < 10)) * 5 +
+                np.isin(self.mode_ids, _PUBLIC_MODE_IDS) * 5)
+    
+    def recommended(self) -> TransportOption:
+        return self.options[int(np.argmax(self.recommendation_scores()))]
 
 class ConsolidatedTransportAPI:
     """Main API class that consolidates all transport data"""
     
     def __init__(self):
+        # One pooled HTTP session shared by the synchronous sub-services, so upstream
+        # connections (TCP, TLS, DNS) are reused across providers and requests
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=100)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        
         # Initialize all service components
         self.integration_agent = TransportIntegrationAgent()
-        self.routing_manager = FallbackRoutingManager()
-        self.taxi_service = TaxiIntegrationService()
+        self.routing_manager = FallbackRoutingManager(session=self._session)
+        self.taxi_service = TaxiIntegrationService(session=self._session)
         self.freshness_validator = DataFreshnessValidator()
         
         # Pricing models for different transport modes
@@ -119,6 +260,15 @@ class ConsolidatedTransportAPI:
             TransportMode.CYCLING: 15
         }
         
+        # Recent responses keyed on quantized coordinates and time bucket
+        self._response_cache: "OrderedDict[tuple, ConsolidatedTransportResponse]" = OrderedDict()
+        # Request threads each run their own event loop but share the cache
+        self._response_cache_lock = threading.Lock()
+        
+        # Last freshness report and when it was taken (monotonic seconds)
+        self._freshness_report = None
+        self._freshness_checked_at = 0.0
+        
         logger.info("Consolidated Transport API initialized")
     
     @error_handler_decorator("consolidated_transport_api")
@@ -129,8 +279,37 @@ class ConsolidatedTransportAPI:
                                        dest_name: Optional[str] = None) -> ConsolidatedTransportResponse:
         """Get all available transport options with cost, ETA, and availability"""
         
-        start_time = datetime.now()
-        logger.info(f"Getting transport options from ({source_lat:.4f}, {source_lng:.4f}) to ({dest_lat:.4f}, {dest_lng:.4f})")
+        cache_key = (
+            round(source_lat, 3), round(source_lng, 3),
+            round(dest_lat, 3), round(dest_lng, 3),
+            source_name, dest_name,
+            int(time.time() // RESPONSE_CACHE_TTL_SECONDS)
+        )
+        lookup_started = time.perf_counter()
+        with self._response_cache_lock:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+        if cached is not None:
+            logger.info("Serving transport options from cache")
+            # Each caller gets its own response object, timed for this call
+            # and echoing its own coordinates; the option objects are shared
+            return replace(
+                cached,
+                source_lat=source_lat,
+                source_lng=source_lng,
+                dest_lat=dest_lat,
+                dest_lng=dest_lng,
+                options=list(cached.options),
+                fallback_providers_used=list(cached.fallback_providers_used),
+                service_status=dict(cached.service_status),
+                response_time_ms=(time.perf_counter() - lookup_started) * 1000
+            )
+        
+        # One timestamp for every option in this response
+        start_time = now = datetime.now()
+        logger.info("Getting transport options from (%.4f, %.4f) to (%.4f, %.4f)",
+                    source_lat, source_lng, dest_lat, dest_lng)
         
         # Initialize response
         response = ConsolidatedTransportResponse(
@@ -146,97 +325,177 @@ class ConsolidatedTransportAPI:
             service_status={}
         )
         
-        # Check data freshness first
-        freshness_report = await self.freshness_validator.validate_all_sources()
+        # Check data freshness first; the report is reused for service status
+        freshness_report = await self._get_freshness_report()
         response.data_freshness_score = self.freshness_validator.get_system_health_score()
         
-        # Auto-refresh stale data if needed
-        if freshness_report.stale_sources or freshness_report.expired_sources:
-            logger.info("Auto-refreshing stale data sources")
-            await self.freshness_validator.auto_refresh_stale_data()
+        # Every option type is priced from the same straight-line distance
+        distance_km = self._calculate_distance(source_lat, source_lng, dest_lat, dest_lng)
         
-        # Gather all transport options concurrently
-        tasks = [
-            self._get_bmtc_options(source_lat, source_lng, dest_lat, dest_lng),
-            self._get_metro_options(source_lat, source_lng, dest_lat, dest_lng),
-            self._get_taxi_options(source_lat, source_lng, dest_lat, dest_lng),
-            self._get_walking_cycling_options(source_lat, source_lng, dest_lat, dest_lng)
-        ]
+        # BMTC and Metro options both come from the same integration agent
+        # payload, so fetch it once and let both helpers await it
+        consolidated = asyncio.ensure_future(
+            self.integration_agent.get_consolidated_transport_data(
+                source_lat, source_lng, dest_lat, dest_lng
+            )
+        )
+        
+        # Gather all transport options concurrently, each within its budget;
+        # BMTC and Metro fall back to estimates if their live data is late
+        timed_out = set()
+        tasks = {
+            'bmtc': self._safe(
+                'bmtc',
+                self._get_bmtc_options(source_lat, source_lng, dest_lat, dest_lng,
+                                       consolidated, distance_km, now),
+                timed_out,
+                lambda: self._get_estimated_bmtc_options(source_lat, source_lng, dest_lat, dest_lng,
+                                                         distance_km, now)
+            ),
+            'metro': self._safe(
+                'metro',
+                self._get_metro_options(source_lat, source_lng, dest_lat, dest_lng,
+                                        consolidated, distance_km, now),
+                timed_out,
+                lambda: self._get_estimated_metro_options(source_lat, source_lng, dest_lat, dest_lng,
+                                                          distance_km, now)
+            ),
+            'taxi': self._safe(
+                'taxi',
+                self._get_taxi_options(source_lat, source_lng, dest_lat, dest_lng, now),
+                timed_out
+            ),
+            'walking_cycling': self._safe(
+                'walking_cycling',
+                self._get_walking_cycling_options(source_lat, source_lng, dest_lat, dest_lng,
+                                                  distance_km, now),
+                timed_out
+            )
+        }
+        
+        # The Pathway real-time fetch overlaps with the option fetches; every
+        # awaitable here handles its own errors, so results are always lists
+        *results, response.pathway_realtime = await asyncio.gather(
+            *tasks.values(),
+            self._get_pathway_realtime_data_safe(source_lat, source_lng, dest_lat, dest_lng)
+        )
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # If BMTC and Metro both timed out nobody awaits the shared fetch any
+        # more; cancel it so it is not left pending on this loop
+        if not consolidated.done():
+            consolidated.cancel()
         
         # Combine all options
-        all_options = []
-        for result in results:
-            if isinstance(result, list):
-                all_options.extend(result)
-            elif isinstance(result, Exception):
-                logger.error(f"Error getting transport options: {result}")
-        
-        # Sort options by a composite score (cost, time, availability)
-        all_options.sort(key=self._calculate_option_score)
-        response.options = all_options
+        all_options = list(itertools.chain.from_iterable(results))
+        response.fallback_providers_used = [
+            name for name in ('bmtc', 'metro') if name in timed_out
+        ]
         
-        # Identify best options
+        # Sort options by a composite score (cost, time, availability) and
+        # pick the best-of winners from the table's columns
         if all_options:
-            response.cheapest_option = min(all_options, key=lambda x: x.cost_inr)
-            response.fastest_option = min(all_options, key=lambda x: x.travel_time_minutes + x.next_availability_minutes)
-            response.most_available_option = min(all_options, key=lambda x: x.next_availability_minutes)
-            response.recommended_option = self._get_recommended_option(all_options)
+            table = TransportOptionTable(all_options).sorted_by_score()
+            all_options = table.options
+            response.cheapest_option = table.cheapest()
+            response.fastest_option = table.fastest()
+            response.most_available_option = table.most_available()
+            response.recommended_option = table.recommended()
+        response.options = all_options
         
         # Check if alternatives are available
         response.alternatives_available = len(all_options) > 0
         
         # Get service status
-        response.service_status = await self._get_service_status()
-        
-        # Get Pathway real-time data
-        logger.info("Attempting to fetch Pathway real-time data...")
-        try:
-            logger.info(f"Integration agent available: {self.integration_agent is not None}")
-            pathway_data = await self.integration_agent._get_pathway_realtime_data(
-                source_lat, source_lng, dest_lat, dest_lng
-            )
-            response.pathway_realtime = pathway_data
-            logger.info(f"Successfully added Pathway real-time data to response: {pathway_data}")
-        except Exception as e:
-            logger.error(f"Failed to get Pathway real-time data: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            response.pathway_realtime = None
+        response.service_status = await self._get_service_status(freshness_report)
+        for name in tasks:
+            if name in timed_out:
+                response.service_status[name] = 'timeout'
         
         # Calculate response time
         response.response_time_ms = (datetime.now() - start_time).total_seconds() * 1000
         
-        logger.info(f"Found {len(all_options)} transport options in {response.response_time_ms:.0f}ms")
+        logger.info("Found %d transport options in %.0fms", len(all_options), response.response_time_ms)
+        
+        # Responses built on fallback estimates are not cached, so the next
+        # request retries the providers that timed out
+        if not timed_out:
+            with self._response_cache_lock:
+                self._response_cache[cache_key] = response
+                if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                    self._response_cache.popitem(last=False)
         
         return response
     
+    async def _safe(self, name: str, coro, timed_out: set,
+                    fallback=None) -> List[TransportOption]:
+        """
+        Await a provider's options within its time budget, never raising
+        
+        On timeout the provider is added to timed_out and the fallback
+        coroutine factory, if any, supplies estimated options; other errors
+        are logged and yield no options.
+        """
+        try:
+            try:
+                return await asyncio.wait_for(coro, timeout=PROVIDER_TIMEOUTS[name])
+            except asyncio.TimeoutError:
+                logger.warning("Timed out getting %s options after %ss", name, PROVIDER_TIMEOUTS[name])
+                timed_out.add(name)
+                return await fallback() if fallback is not None else []
+        except Exception as e:
+            logger.error("Error getting %s options: %s", name, e)
+            return []
+    
+    async def _get_pathway_realtime_data_safe(self, source_lat: float, source_lng: float,
+                                              dest_lat: float, dest_lng: float) -> Optional[Dict[str, Any]]:
+        """Get Pathway real-time data within its time budget, returning None on failure"""
+        logger.info("Attempting to fetch Pathway real-time data...")
+        try:
+            logger.info("Integration agent available: %s", self.integration_agent is not None)
+            pathway_data = await asyncio.wait_for(
+                self.integration_agent._get_pathway_realtime_data(
+                    source_lat, source_lng, dest_lat, dest_lng
+                ),
+                timeout=PROVIDER_TIMEOUTS['pathway']
+            )
+            logger.info("Successfully added Pathway real-time data to response: %s", pathway_data)
+            return pathway_data
+        except asyncio.TimeoutError:
+            logger.warning("Timed out getting Pathway real-time data after %ss", PROVIDER_TIMEOUTS['pathway'])
+            return None
+        except Exception as e:
+            logger.error("Failed to get Pathway real-time data: %s", e)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Traceback: %s", traceback.format_exc())
+            return None
+    
     async def _get_bmtc_options(self, source_lat: float, source_lng: float,
-                               dest_lat: float, dest_lng: float) -> List[TransportOption]:
+                               dest_lat: float, dest_lng: float,
+                               consolidated: Optional[asyncio.Future] = None,
+                               distance_km: Optional[float] = None,
+                               now: Optional[datetime] = None) -> List[TransportOption]:
         """Get BMTC bus options"""
         options = []
+        if distance_km is None:
+            distance_km = self._calculate_distance(source_lat, source_lng, dest_lat, dest_lng)
+        if now is None:
+            now = datetime.now()
         
         try:
-            # Get BMTC data from integration agent
-            bmtc_data = await self.integration_agent.get_consolidated_transport_data(
-                source_lat, source_lng, dest_lat, dest_lng
-            )
+            # Get BMTC data from integration agent, reusing a shared fetch if given
+            if consolidated is not None:
+                # Shielded so a timeout here does not cancel the shared fetch
+                bmtc_data = await asyncio.shield(consolidated)
+            else:
+                bmtc_data = await self.integration_agent.get_consolidated_transport_data(
+                    source_lat, source_lng, dest_lat, dest_lng
+                )
             
             if bmtc_data and 'bmtc' in bmtc_data:
                 bmtc_info = bmtc_data['bmtc']
                 
-                # Calculate distance for pricing
-                distance_km = self._calculate_distance(source_lat, source_lng, dest_lat, dest_lng)
-                
                 # Generate options for different BMTC bus types
-                bus_types = [
-                    (TransportMode.BMTC_REGULAR, 'Regular'),
-                    (TransportMode.BMTC_AC, 'AC'),
-                    (TransportMode.BMTC_VOLVO, 'Volvo')
-                ]
-                
-                for mode, bus_type in bus_types:
+                for mode, bus_type, bus_type_lower in _BMTC_BUS_TYPES:
                     # Calculate fare
                     pricing = self.pricing_models[mode]
                     fare = min(pricing['base'] + (distance_km * pricing['per_km']), pricing['max'])
@@ -245,7 +504,7 @@ class ConsolidatedTransportAPI:
                     travel_time = (distance_km / self.avg_speeds[mode]) * 60
                     
                     # Get next availability from live data
-                    next_availability = self._get_bmtc_next_availability(bmtc_info, bus_type)
+                    next_availability = self._get_bmtc_next_availability(bmtc_info, bus_type_lower, now.hour)
                     
                     # Determine confidence based on data freshness
                     confidence = 0.9 if bmtc_info.get('data_fresh', False) else 0.6
@@ -260,35 +519,47 @@ class ConsolidatedTransportAPI:
                         route_description=f"BMTC {bus_type} Bus",
                         confidence_score=confidence,
                         stops=bmtc_info.get('stops', []),
-                        last_updated=datetime.now(),
+                        last_updated=now,
                         data_source='live' if bmtc_info.get('data_fresh', False) else 'cached'
                     )
                     
                     options.append(option)
             
         except Exception as e:
-            logger.error(f"Error getting BMTC options: {e}")
+            logger.error("Error getting BMTC options: %s", e)
             # Fallback to estimated options
-            options.extend(await self._get_estimated_bmtc_options(source_lat, source_lng, dest_lat, dest_lng))
+            options.extend(await self._get_estimated_bmtc_options(
+                source_lat, source_lng, dest_lat, dest_lng, distance_km, now
+            ))
         
         return options
     
     async def _get_metro_options(self, source_lat: float, source_lng: float,
-                                dest_lat: float, dest_lng: float) -> List[TransportOption]:
+                                dest_lat: float, dest_lng: float,
+                                consolidated: Optional[asyncio.Future] = None,
+                                distance_km: Optional[float] = None,
+                                now: Optional[datetime] = None) -> List[TransportOption]:
         """Get Metro (BMRCL) options"""
         options = []
+        if distance_km is None:
+            distance_km = self._calculate_distance(source_lat, source_lng, dest_lat, dest_lng)
+        if now is None:
+            now = datetime.now()
         
         try:
-            # Get Metro data from integration agent
-            metro_data = await self.integration_agent.get_consolidated_transport_data(
-                source_lat, source_lng, dest_lat, dest_lng
-            )
+            # Get Metro data from integration agent, reusing a shared fetch if given
+            if consolidated is not None:
+                # Shielded so a timeout here does not cancel the shared fetch
+                metro_data = await asyncio.shield(consolidated)
+            else:
+                metro_data = await self.integration_agent.get_consolidated_transport_data(
+                    source_lat, source_lng, dest_lat, dest_lng
+                )
             
             if metro_data and 'metro' in metro_data:
                 metro_info = metro_data['metro']
                 
-                # Calculate distance and fare
-                distance_km = self._calculate_distance(source_lat, source_lng, dest_lat, dest_lng)
+                # Calculate fare
                 pricing = self.pricing_models[TransportMode.METRO]
                 fare = min(pricing['base'] + (distance_km * pricing['per_km']), pricing['max'])
                 
@@ -296,7 +567,7 @@ class ConsolidatedTransportAPI:
                 travel_time = (distance_km / self.avg_speeds[TransportMode.METRO]) * 60
                 
                 # Get next train availability
-                next_availability = self._get_metro_next_availability(metro_info)
+                next_availability = self._get_metro_next_availability(metro_info, now.hour)
                 
                 # Determine confidence
                 confidence = 0.9 if metro_info.get('data_fresh', False) else 0.6
@@ -311,23 +582,28 @@ class ConsolidatedTransportAPI:
                     route_description="Namma Metro",
                     confidence_score=confidence,
                     stops=metro_info.get('stations', []),
-                    last_updated=datetime.now(),
+                    last_updated=now,
                     data_source='live' if metro_info.get('data_fresh', False) else 'cached'
                 )
                 
                 options.append(option)
             
         except Exception as e:
-            logger.error(f"Error getting Metro options: {e}")
+            logger.error("Error getting Metro options: %s", e)
             # Fallback to estimated options
-            options.extend(await self._get_estimated_metro_options(source_lat, source_lng, dest_lat, dest_lng))
+            options.extend(await self._get_estimated_metro_options(
+                source_lat, source_lng, dest_lat, dest_lng, distance_km, now
+            ))
         
         return options
     
     async def _get_taxi_options(self, source_lat: float, source_lng: float,
-                               dest_lat: float, dest_lng: float) -> List[TransportOption]:
+                               dest_lat: float, dest_lng: float,
+                               now: Optional[datetime] = None) -> List[TransportOption]:
         """Get taxi options from all providers"""
         options = []
+        if now is None:
+            now = datetime.now()
         
         try:
             # Get taxi data from taxi service
@@ -336,15 +612,7 @@ class ConsolidatedTransportAPI:
             if taxi_response.success:
                 for taxi_option in taxi_response.options:
                     # Map taxi types to transport modes
-                    mode_mapping = {
-                        'auto': TransportMode.TAXI_AUTO,
-                        'mini': TransportMode.TAXI_MINI,
-                        'sedan': TransportMode.TAXI_SEDAN,
-                        'suv': TransportMode.TAXI_SUV,
-                        'bike': TransportMode.TAXI_BIKE
-                    }
-                    
-                    mode = mode_mapping.get(taxi_option.vehicle_type.lower(), TransportMode.TAXI_MINI)
+                    mode = _TAXI_MODE_MAP.get(taxi_option.vehicle_type.lower(), TransportMode.TAXI_MINI)
                     
                     # Determine confidence based on provider
                     confidence = 0.9 if taxi_option.provider in ['uber', 'ola'] else 0.7
@@ -360,7 +628,7 @@ class ConsolidatedTransportAPI:
                         confidence_score=confidence,
                         surge_multiplier=taxi_option.surge_multiplier,
                         booking_fee=taxi_option.booking_fee,
-                        last_updated=datetime.now(),
+                        last_updated=now,
                         data_source='live',
                         fallback_used=taxi_option.provider == 'mock'
                     )
@@ -368,17 +636,30 @@ class ConsolidatedTransportAPI:
                     options.append(option)
             
         except Exception as e:
-            logger.error(f"Error getting taxi options: {e}")
+            logger.error("Error getting taxi options: %s", e)
         
         return options
     
     async def _get_walking_cycling_options(self, source_lat: float, source_lng: float,
-                                          dest_lat: float, dest_lng: float) -> List[TransportOption]:
+                                          dest_lat: float, dest_lng: float,
+                                          distance_km: Optional[float] = None,
+                                          now: Optional[datetime] = None) -> List[TransportOption]:
         """Get walking and cycling options"""
         options = []
         
+        if now is None:
+            now = datetime.now()
+        
         try:
-            distance_km = self._calculate_distance(source_lat, source_lng, dest_lat, dest_lng)
+            if distance_km is None:
+                # Cheap bounding-box rejection before the Haversine: around
+                # Bangalore a degree spans at least ~108 km, so 0.14 degrees
+                # on either axis is already beyond the 15 km cycling limit
+                if abs(dest_lat - source_lat) > 0.14 or abs(dest_lng - source_lng) > 0.14:
+                    return options
+                distance_km = self._calculate_distance(source_lat, source_lng, dest_lat, dest_lng)
+            elif distance_km > 15:
+                return options
             
             # Walking option (if distance is reasonable)
             if distance_km <= 5:  # Up to 5km for walking
@@ -393,7 +674,7 @@ class ConsolidatedTransportAPI:
                     distance_km=round(distance_km, 2),
                     route_description="Walking",
                     confidence_score=1.0,
-                    last_updated=datetime.now(),
+                    last_updated=now,
                     data_source='calculated'
                 )
                 
@@ -412,22 +693,27 @@ class ConsolidatedTransportAPI:
                     distance_km=round(distance_km, 2),
                     route_description="Cycling",
                     confidence_score=1.0,
-                    last_updated=datetime.now(),
+                    last_updated=now,
                     data_source='calculated'
                 )
                 
                 options.append(cycling_option)
             
         except Exception as e:
-            logger.error(f"Error getting walking/cycling options: {e}")
+            logger.error("Error getting walking/cycling options: %s", e)
         
         return options
     
     async def _get_estimated_bmtc_options(self, source_lat: float, source_lng: float,
-                                         dest_lat: float, dest_lng: float) -> List[TransportOption]:
+                                         dest_lat: float, dest_lng: float,
+                                         distance_km: Optional[float] = None,
+                                         now: Optional[datetime] = None) -> List[TransportOption]:
         """Get estimated BMTC options when live data is unavailable"""
         options = []
-        distance_km = self._calculate_distance(source_lat, source_lng, dest_lat, dest_lng)
+        if distance_km is None:
+            distance_km = self._calculate_distance(source_lat, source_lng, dest_lat, dest_lng)
+        if now is None:
+            now = datetime.now()
         
         bus_types = [
             (TransportMode.BMTC_REGULAR, 'Regular'),
@@ -448,7 +734,7 @@ class ConsolidatedTransportAPI:
                 distance_km=round(distance_km, 2),
                 route_description=f"BMTC {bus_type} Bus (Estimated)",
                 confidence_score=0.5,
-                last_updated=datetime.now(),
+                last_updated=now,
                 data_source='estimated',
                 fallback_used=True
             )
@@ -458,10 +744,15 @@ class ConsolidatedTransportAPI:
         return options
     
     async def _get_estimated_metro_options(self, source_lat: float, source_lng: float,
-                                          dest_lat: float, dest_lng: float) -> List[TransportOption]:
+                                          dest_lat: float, dest_lng: float,
+                                          distance_km: Optional[float] = None,
+                                          now: Optional[datetime] = None) -> List[TransportOption]:
         """Get estimated Metro options when live data is unavailable"""
         options = []
-        distance_km = self._calculate_distance(source_lat, source_lng, dest_lat, dest_lng)
+        if distance_km is None:
+            distance_km = self._calculate_distance(source_lat, source_lng, dest_lat, dest_lng)
+        if now is None:
+            now = datetime.now()
         
         pricing = self.pricing_models[TransportMode.METRO]
         fare = min(pricing['base'] + (distance_km * pricing['per_km']), pricing['max'])
@@ -476,7 +767,7 @@ class ConsolidatedTransportAPI:
             distance_km=round(distance_km, 2),
             route_description="Namma Metro (Estimated)",
             confidence_score=0.5,
-            last_updated=datetime.now(),
+            last_updated=now,
             data_source='estimated',
             fallback_used=True
         )
@@ -484,138 +775,101 @@ class ConsolidatedTransportAPI:
         options.append(option)
         return options
     
-    def _get_bmtc_next_availability(self, bmtc_info: Dict, bus_type: str) -> int:
-        """Calculate next BMTC bus availability"""
+    def _get_bmtc_next_availability(self, bmtc_info: Dict, bus_type_lower: str,
+                                    current_hour: Optional[int] = None) -> int:
+        """Calculate next BMTC bus availability for a lowercase bus type"""
         try:
             live_buses = bmtc_info.get('live_buses', [])
             
-            # Filter buses by type if possible
-            relevant_buses = [bus for bus in live_buses if bus_type.lower() in bus.get('type', '').lower()]
-            
-            if not relevant_buses:
-                relevant_buses = live_buses
+            # Find the closest bus of this type, and the closest bus of any
+            # type in case none match, in one pass
+            best_typed = best_any = float('inf')
+            for bus in live_buses:
+                eta = bus.get('eta_minutes', 10)
+                if eta < best_any:
+                    best_any = eta
+                if eta < best_typed and bus_type_lower in bus.get('type', '').lower():
+                    best_typed = eta
             
-            if relevant_buses:
-                # Find the closest bus
-                min_eta = min(bus.get('eta_minutes', 10) for bus in relevant_buses)
+            if live_buses:
+                min_eta = best_typed if best_typed != float('inf') else best_any
                 return max(1, min_eta)  # At least 1 minute
             else:
                 # Default estimate based on time of day
-                current_hour = datetime.now().hour
+                if current_hour is None:
+                    current_hour = datetime.now().hour
                 if 7 <= current_hour <= 10 or 17 <= current_hour <= 20:  # Peak hours
                     return 5
                 else:
                     return 8
                     
         except Exception as e:
-            logger.error(f"Error calculating BMTC availability: {e}")
+            logger.error("Error calculating BMTC availability: %s", e)
             return 8
     
-    def _get_metro_next_availability(self, metro_info: Dict) -> int:
+    def _get_metro_next_availability(self, metro_info: Dict,
+                                     current_hour: Optional[int] = None) -> int:
         """Calculate next Metro train availability"""
         try:
             live_trains = metro_info.get('live_trains', [])
             
             if live_trains:
                 # Find the next train
-                min_eta = min(train.get('eta_minutes', 5) for train in live_trains)
+                min_eta = float('inf')
+                for train in live_trains:
+                    eta = train.get('eta_minutes', 5)
+                    if eta < min_eta:
+                        min_eta = eta
                 return max(1, min_eta)
             else:
                 # Metro frequency is usually 3-7 minutes
-                current_hour = datetime.now().hour
+                if current_hour is None:
+                    current_hour = datetime.now().hour
                 if 7 <= current_hour <= 10 or 17 <= current_hour <= 20:  # Peak hours
                     return 3
                 else:
                     return 5
                     
         except Exception as e:
-            logger.error(f"Error calculating Metro availability: {e}")
+            logger.error("Error calculating Metro availability: %s", e)
             return 5
     
     def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate Haversine distance between two points"""
-        import math
-        
-        R = 6371  # Earth's radius in kilometers
-        
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
-        
-        a = (math.sin(delta_lat / 2) ** 2 + 
-             math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        
-        return R * c
+        return calculate_distance_nb(float(lat1), float(lon1), float(lat2), float(lon2))
     
-    def _calculate_option_score(self, option: TransportOption) -> float:
-        """Calculate a composite score for sorting options"""
-        # Normalize factors (lower is better)
-        cost_score = option.cost_inr / 100.0  # Normalize to 0-1 range
-        time_score = (option.travel_time_minutes + option.next_availability_minutes) / 60.0
-        availability_score = option.next_availability_minutes / 30.0
-        confidence_penalty = (1.0 - option.confidence_score) * 0.5
-        
-        # Weighted composite score
-        composite_score = (cost_score * 0.3 + 
-                          time_score * 0.4 + 
-                          availability_score * 0.2 + 
-                          confidence_penalty * 0.1)
+    async def _get_freshness_report(self):
+        """Validate data sources, reusing a report taken within the TTL"""
+        checked_at = time.monotonic()
+        if (self._freshness_report is not None and
+                checked_at - self._freshness_checked_at < FRESHNESS_REPORT_TTL_SECONDS):
+            return self._freshness_report
         
-        return composite_score
-    
-    def _get_recommended_option(self, options: List[TransportOption]) -> Optional[TransportOption]:
-        """Get the recommended option based on multiple factors"""
-        if not options:
-            return None
+        freshness_report = await self.freshness_validator.validate_all_sources()
         
-        # Score each option
-        scored_options = []
-        for option in options:
-            score = 0
-            
-            # Prefer reliable data sources
-            if option.confidence_score > 0.8:
-                score += 20
-            elif option.confidence_score > 0.6:
-                score += 10
-            
-            # Prefer faster options
-            total_time = option.travel_time_minutes + option.next_availability_minutes
-            if total_time < 30:
-                score += 15
-            elif total_time < 60:
-                score += 10
-            
-            # Prefer cost-effective options
-            if option.cost_inr < 50:
-                score += 15
-            elif option.cost_inr < 100:
-                score += 10
-            
-            # Prefer available options
-            if option.next_availability_minutes < 5:
-                score += 10
-            elif option.next_availability_minutes < 10:
-                score += 5
-            
-            # Bonus for public transport
-            if option.mode in [TransportMode.BMTC_REGULAR, TransportMode.BMTC_AC, TransportMode.METRO]:
-                score += 5
-            
-            scored_options.append((option, score))
+        # Auto-refresh stale data if needed
+        if freshness_report.stale_sources or freshness_report.expired_sources:
+            logger.info("Auto-refreshing stale data sources")
+            await self.freshness_validator.auto_refresh_stale_data()
         
-        # Return the highest scored option
-        return max(scored_options, key=lambda x: x[1])[0]
+        self._freshness_report = freshness_report
+        self._freshness_checked_at = checked_at
+        return freshness_report
     
-    async def _get_service_status(self) -> Dict[str, str]:
-        """Get status of all services"""
+    async def _get_service_status(self, freshness_report=None) -> Dict[str, str]:
+        """Get status of all services, reusing a freshness report if given"""
         status = {}
         
         try:
+            # Provider status is an in-memory snapshot of health flags, so
+            # both are read inline; an executor hop would cost more than
+            # the lookups themselves
+            routing_status = self.routing_manager.get_provider_status()
+            taxi_status = self.taxi_service.get_provider_status()
+            
             # Get freshness report
-            freshness_report = await self.freshness_validator.validate_all_sources()
+            if freshness_report is None:
+                freshness_report = await self._get_freshness_report()
             
             for source, info in freshness_report.sources.items():
                 if info.status.value == 'fresh':
@@ -625,20 +879,20 @@ class ConsolidatedTransportAPI:
                 else:
                     status[source.value] = 'unhealthy'
             
-            # Get routing provider status
-            routing_status = self.routing_manager.get_provider_status()
             status['routing'] = 'healthy' if routing_status['available_providers'] else 'unhealthy'
-            
-            # Get taxi provider status
-            taxi_status = self.taxi_service.get_provider_status()
             status['taxi'] = 'healthy' if taxi_status['available_providers'] else 'unhealthy'
             
         except Exception as e:
-            logger.error(f"Error getting service status: {e}")
+            logger.error("Error getting service status: %s", e)
             status['error'] = str(e)
         
         return status
     
+    async def close(self):
+        """Release pooled HTTP connections held by the shared session and clients"""
+        self._session.close()
+        await self.freshness_validator.aclose()
+    
     async def get_quick_summary(self, source_lat: float, source_lng: float,
                                dest_lat: float, dest_lng: float) -> Dict[str, Any]:
         """Get a quick summary of transport options"""
@@ -667,7 +921,7 @@ class ConsolidatedTransportAPI:
             return summary
             
         except Exception as e:
-            logger.error(f"Error getting quick summary: {e}")
+            logger.error("Error getting quick summary: %s", e)
             return {'error': str(e)}
 
 # Global instance
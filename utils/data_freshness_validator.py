@@ -5,21 +5,105 @@ Ensures data is fresh (≤30 seconds) and triggers automatic refreshes when need
 """
 
 import os
-import requests
+import httpx
 import json
 import logging
 import asyncio
+import atexit
 import time
+import functools
+import itertools
+import threading
+import warnings
+import weakref
+from collections import deque
+from types import MappingProxyType
+from urllib.parse import urlencode
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime
 from enum import Enum
 
+import numpy as np
+import orjson
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 from .common import setup_logging
 from .error_handler import error_handler_decorator, performance_monitor
 
 logger = setup_logging("data_freshness_validator")
 
+# Fleets at least this large have their timestamps parsed as one NumPy array
+NUMPY_TIMESTAMP_MIN_RECORDS = 32
+
+# Connection pool for the validator's async client; keep-alive connections
+# are reused across every endpoint check and refresh call
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=300)
+HTTP_TIMEOUT = httpx.Timeout(10.0)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_iso_timestamp(value: str) -> Optional[datetime]:
+    """Parse an ISO-8601 timestamp, or return None if it is malformed
+    
+    Feeds report the same timestamps across consecutive polls, so parsed
+    values are memoized. datetime.fromisoformat is implemented in C and
+    outruns a regex plus calendar.timegm conversion several times over, so
+    it stays the parser even for first-seen strings.
+    """
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+def _newest_timestamp_np(values: List[str]) -> Optional[datetime]:
+    """Newest of many naive ISO-8601 timestamps via a datetime64 array
+    
+    Returns None when any value is malformed or carries a timezone, which
+    NumPy would silently shift to UTC; the caller then parses per value.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            newest = np.array(values, dtype='datetime64[us]').max()
+    except (ValueError, Warning):
+        return None
+    if np.isnat(newest):
+        return None
+    return newest.item()
+
+def _scan_max(records: List[Dict], key: str) -> Optional[datetime]:
+    """Single-pass running max of the parseable timestamps under key"""
+    latest = None
+    for record in records:
+        value = record.get(key)
+        if type(value) is not str:
+            continue
+        ts = _parse_iso_timestamp(value)
+        if ts is not None and (latest is None or ts > latest):
+            latest = ts
+    return latest
+
+def _newest_timestamp(records: List[Dict], key: str = 'last_updated') -> Optional[datetime]:
+    """Most recent parseable timestamp among records, or None"""
+    if len(records) >= NUMPY_TIMESTAMP_MIN_RECORDS:
+        values = [value for value in (record.get(key) for record in records) if type(value) is str]
+        if len(values) >= NUMPY_TIMESTAMP_MIN_RECORDS:
+            newest = _newest_timestamp_np(values)
+            if newest is not None:
+                return newest
+    
+    # Small feeds, and anything NumPy cannot parse exactly, take one pass
+    # with no intermediate list
+    return _scan_max(records, key)
+
 class DataSource(Enum):
     """Enumeration of data sources"""
     BMTC = "bmtc"
@@ -27,6 +111,11 @@ class DataSource(Enum):
     TAXI = "taxi"
     ROUTING = "routing"
 
+# Position of each source in the validator's per-source tuples; Enum members
+# hash through a Python-level __hash__, so hot paths index tuples instead
+_SOURCES = tuple(DataSource)
+_SOURCE_INDEX = {source: i for i, source in enumerate(_SOURCES)}
+
 class FreshnessStatus(Enum):
     """Enumeration of freshness status"""
     FRESH = "fresh"
@@ -34,6 +123,26 @@ class FreshnessStatus(Enum):
     EXPIRED = "expired"
     UNAVAILABLE = "unavailable"
 
+# Upper bound (seconds) on reusing a source's last probe result; a source's
+# own freshness threshold caps it further
+PROBE_CACHE_TTL_SECONDS = 5
+
+# Sample trip used to probe the taxi options endpoint
+TAXI_PROBE_PARAMS = (
+    ('source_lat', 12.9716),
+    ('source_lng', 77.5946),
+    ('dest_lat', 12.9698),
+    ('dest_lng', 77.7500)
+)
+
+# Health score contribution of each freshness status (0-100)
+_STATUS_SCORES = {
+    FreshnessStatus.FRESH: 100.0,
+    FreshnessStatus.STALE: 70.0,
+    FreshnessStatus.EXPIRED: 30.0,
+    FreshnessStatus.UNAVAILABLE: 0.0
+}
+
 @dataclass
 class DataFreshnessInfo:
     """Information about data freshness"""
@@ -56,15 +165,120 @@ class FreshnessReport:
     expired_sources: List[DataSource]
     recommendations: List[str]
 
+class _TrendStats:
+    """Running sums over one source's history, updated as entries come and go
+    
+    Entries are evicted oldest-first, so the maximum finite age is kept with
+    a monotonic deque of (sequence number, age) pairs.
+    """
+    
+    __slots__ = ('count', 'age_sum', 'age_count', 'response_time_sum',
+                 'data_count_sum', 'status_counts', '_max_ages', '_next_seq', '_head_seq')
+    
+    def __init__(self):
+        self.count = 0
+        self.age_sum = 0.0
+        self.age_count = 0
+        self.response_time_sum = 0.0
+        self.data_count_sum = 0
+        self.status_counts: Dict[str, int] = {}
+        self._max_ages = deque()
+        self._next_seq = 0
+        self._head_seq = 0
+    
+    def add(self, entry: Dict[str, Any]):
+        self.count += 1
+        self.response_time_sum += entry['response_time_ms']
+        self.data_count_sum += entry['data_count']
+        status = entry['status'].value
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        
+        age = entry['age_seconds']
+        if age != float('inf'):
+            self.age_sum += age
+            self.age_count += 1
+            while self._max_ages and self._max_ages[-1][1] <= age:
+                self._max_ages.pop()
+            self._max_ages.append((self._next_seq, age))
+        self._next_seq += 1
+    
+    def remove_oldest(self, entry: Dict[str, Any]):
+        self.count -= 1
+        self.response_time_sum -= entry['response_time_ms']
+        self.data_count_sum -= entry['data_count']
+        status = entry['status'].value
+        self.status_counts[status] -= 1
+        if not self.status_counts[status]:
+            del self.status_counts[status]
+        
+        age = entry['age_seconds']
+        if age != float('inf'):
+            self.age_sum -= age
+            self.age_count -= 1
+        if self._max_ages and self._max_ages[0][0] == self._head_seq:
+            self._max_ages.popleft()
+        self._head_seq += 1
+    
+    @property
+    def max_age(self) -> Optional[float]:
+        return self._max_ages[0][1] if self._max_ages else None
+
+def _extract_live_max(data: Dict, now: datetime) -> Tuple[Optional[datetime], int]:
+    """Newest update and record count from a BMTC/BMRCL live-data feed"""
+    if 'live_data' not in data:
+        return None, 0
+    live_data = data['live_data']
+    return _newest_timestamp(live_data), len(live_data)
+
+def _extract_taxi_ts(data: Dict, now: datetime) -> Tuple[Optional[datetime], int]:
+    """Response timestamp and option count from the taxi options endpoint"""
+    if 'options' not in data:
+        return None, 0
+    timestamp = data.get('timestamp')
+    last_update = _parse_iso_timestamp(timestamp) if isinstance(timestamp, str) else None
+    return last_update, len(data['options'])
+
+def _extract_routing_ts(data: Dict, now: datetime) -> Tuple[Optional[datetime], int]:
+    """A healthy routing service counts as updated just now"""
+    if data.get('status') == 'healthy':
+        return now, 1
+    return None, 0
+
 class DataFreshnessValidator:
     """Validates data freshness across all transport data sources"""
     
-    def __init__(self, base_url: str = "http://localhost:5000"):
+    # Response parser per source, returning (last update, data count)
+    _SOURCE_PARSERS = {
+        DataSource.BMTC: _extract_live_max,
+        DataSource.BMRCL: _extract_live_max,
+        DataSource.TAXI: _extract_taxi_ts,
+        DataSource.ROUTING: _extract_routing_ts
+    }
+    
+    # Refresh endpoint, timeout (seconds) and success message per source
+    _REFRESH_SPECS = {
+        DataSource.BMTC: ('/api/refresh/bmtc', 30, "BMTC data refresh triggered successfully"),
+        DataSource.BMRCL: ('/api/refresh/bmrcl', 30, "BMRCL data refresh triggered successfully"),
+        DataSource.TAXI: ('/api/taxi/clear_cache', 10, "Taxi data cache cleared successfully"),
+        DataSource.ROUTING: ('/api/routing/health_check', 10, "Routing service health check triggered")
+    }
+    
+    def __init__(self, base_url: str = "http://localhost:5000",
+                 client: Optional[httpx.AsyncClient] = None):
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
+        
+        # Own async clients are created on first use, one per running event
+        # loop, so concurrent requests on separate loops never share one; an
+        # injected client is used as-is
+        self._client = client
+        self._owns_client = client is None
+        self._loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._loop_clients_lock = threading.Lock()
         
         # Freshness thresholds (in seconds)
-        self.thresholds = {
+        thresholds = {
             DataSource.BMTC: 30,      # 30 seconds for BMTC live data
             DataSource.BMRCL: 30,     # 30 seconds for BMRCL live data
             DataSource.TAXI: 60,      # 1 minute for taxi data (less frequent updates)
@@ -72,19 +286,87 @@ class DataFreshnessValidator:
         }
         
         # API endpoints to check
-        self.endpoints = {
+        endpoints = {
             DataSource.BMTC: "/api/live/bmtc",
             DataSource.BMRCL: "/api/live/bmrcl",
             DataSource.TAXI: "/api/taxi/options",
             DataSource.ROUTING: "/api/health"
         }
         
-        # Historical data for trend analysis
-        self.freshness_history = {source: [] for source in DataSource}
+        # Per-source settings as tuples in _SOURCES order, with read-only
+        # mapping views for external callers
+        self._threshold_arr = tuple(thresholds[source] for source in _SOURCES)
+        self._endpoint_arr = tuple(endpoints[source] for source in _SOURCES)
+        self.thresholds = MappingProxyType(thresholds)
+        self.endpoints = MappingProxyType(endpoints)
+        
+        # Last probe result per source as (monotonic time, info); within the
+        # TTL the answer to "is this source fresh?" cannot have changed
+        self._probe_cache: List[Optional[Tuple[float, DataFreshnessInfo]]] = [None] * len(_SOURCES)
+        self._probe_ttl = tuple(min(threshold, PROBE_CACHE_TTL_SECONDS) for threshold in self._threshold_arr)
+        
+        # Full probe URLs, built once; the taxi probe carries its sample
+        # coordinates as a pre-encoded query string
+        urls = [f"{self.base_url}{endpoint}" for endpoint in self._endpoint_arr]
+        urls[_SOURCE_INDEX[DataSource.TAXI]] += '?' + urlencode(TAXI_PROBE_PARAMS)
+        self._url_arr = tuple(urls)
+        
+        # Historical data for trend analysis; bounded deques drop the oldest entry
         self.max_history_size = 100
+        self.freshness_history = {source: deque(maxlen=self.max_history_size) for source in DataSource}
+        self._trend_stats = {source: _TrendStats() for source in DataSource}
+        
+        # Health score weights aligned with _SOURCES order
+        # (BMTC and BMRCL are critical, taxi and routing important)
+        self._health_weights = np.array([30, 30, 20, 20], dtype=np.float64)
         
         logger.info("Data Freshness Validator initialized")
     
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the async HTTP client for the running event loop, creating it if needed"""
+        if not self._owns_client:
+            return self._client
+        
+        # Pooled connections belong to the loop that opened them, so callers
+        # that run each request in a fresh loop get a fresh client and must
+        # aclose() it before closing that loop
+        loop = asyncio.get_running_loop()
+        with self._loop_clients_lock:
+            client = self._loop_clients.get(loop)
+            if client is None:
+                # With HTTP/2 the concurrent endpoint checks against one HTTPS
+                # host are multiplexed over a single connection instead of one
+                # socket each; plain http:// URLs (like the local default) stay
+                # on HTTP/1.1
+                client = httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+                self._loop_clients[loop] = client
+        return client
+    
+    async def aclose(self):
+        """Close the running event loop's own async HTTP client and its pooled connections"""
+        if not self._owns_client:
+            return
+        
+        with self._loop_clients_lock:
+            client = self._loop_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+    
+    def close(self):
+        """Close own HTTP clients from synchronous code, e.g. at interpreter exit"""
+        if not self._owns_client:
+            return
+        
+        with self._loop_clients_lock:
+            loop_clients = list(self._loop_clients.items())
+            self._loop_clients.clear()
+        
+        # Connections can only be shut down from the loop that opened them;
+        # clients whose loop is closed or busy are simply released
+        for loop, client in loop_clients:
+            if not loop.is_closed() and not loop.is_running():
+                loop.run_until_complete(client.aclose())
+    
     @error_handler_decorator("data_freshness_validator")
     @performance_monitor("data_freshness_validator")
     async def validate_all_sources(self) -> FreshnessReport:
@@ -96,10 +378,30 @@ class DataFreshnessValidator:
         expired_sources = []
         recommendations = []
         
-        # Check each data source
-        for source in DataSource:
+        # Probe every source without a recent result, concurrently
+        checked_at = time.monotonic()
+        probes = {}
+        for i, source in enumerate(_SOURCES):
+            cached = self._probe_cache[i]
+            if cached is None or checked_at - cached[0] >= self._probe_ttl[i]:
+                probes[i] = self._check_source_freshness(source)
+        
+        results = await asyncio.gather(*probes.values(), return_exceptions=True)
+        probed = dict(zip(probes, results))
+        
+        for i, source in enumerate(_SOURCES):
             try:
-                freshness_info = await self._check_source_freshness(source)
+                if i in probed:
+                    freshness_info = probed[i]
+                    if isinstance(freshness_info, Exception):
+                        raise freshness_info
+                    self._probe_cache[i] = (checked_at, freshness_info)
+                    
+                    # Add to history
+                    self._add_to_history(source, freshness_info)
+                else:
+                    freshness_info = self._probe_cache[i][1]
+                
                 sources_info[source] = freshness_info
                 
                 # Track stale and expired sources
@@ -108,14 +410,11 @@ class DataFreshnessValidator:
                 elif freshness_info.status in [FreshnessStatus.EXPIRED, FreshnessStatus.UNAVAILABLE]:
                     expired_sources.append(source)
                 
-                # Add to history
-                self._add_to_history(source, freshness_info)
-                
             except Exception as e:
                 logger.error(f"Error checking {source.value}: {e}")
                 sources_info[source] = DataFreshnessInfo(
                     source=source,
-                    endpoint=self.endpoints[source],
+                    endpoint=self._endpoint_arr[i],
                     last_update=None,
                     age_seconds=float('inf'),
                     status=FreshnessStatus.UNAVAILABLE,
@@ -146,29 +445,19 @@ class DataFreshnessValidator:
     
     async def _check_source_freshness(self, source: DataSource) -> DataFreshnessInfo:
         """Check freshness of a specific data source"""
-        endpoint = self.endpoints[source]
-        url = f"{self.base_url}{endpoint}"
+        i = _SOURCE_INDEX[source]
+        endpoint = self._endpoint_arr[i]
         
         start_time = time.time()
         
         try:
-            # Special handling for different endpoints
-            if source == DataSource.TAXI:
-                # For taxi, we need to provide coordinates
-                params = {
-                    'source_lat': 12.9716,
-                    'source_lng': 77.5946,
-                    'dest_lat': 12.9698,
-                    'dest_lng': 77.7500
-                }
-                response = self.session.get(url, params=params, timeout=10)
-            else:
-                response = self.session.get(url, timeout=10)
+            response = await self._get_client().get(self._url_arr[i], timeout=10)
             
             response_time_ms = (time.time() - start_time) * 1000
             
             if response.status_code == 200:
-                data = response.json()
+                # Live-data payloads can be large; orjson parses the raw bytes
+                data = orjson.loads(response.content)
                 return self._analyze_response_freshness(source, endpoint, data, response_time_ms)
             else:
                 logger.error(f"HTTP {response.status_code} for {source.value}")
@@ -182,7 +471,7 @@ class DataFreshnessValidator:
                     response_time_ms=response_time_ms
                 )
                 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"Timeout checking {source.value}")
             return DataFreshnessInfo(
                 source=source,
@@ -193,7 +482,7 @@ class DataFreshnessValidator:
                 error_message="Request timeout",
                 response_time_ms=(time.time() - start_time) * 1000
             )
-        except requests.exceptions.RequestException as e:
+        except httpx.RequestError as e:
             logger.error(f"Request error for {source.value}: {e}")
             return DataFreshnessInfo(
                 source=source,
@@ -212,78 +501,22 @@ class DataFreshnessValidator:
         last_update = None
         data_count = 0
         age_seconds = float('inf')
+        now = datetime.now()
         
         try:
             # Extract timestamp and data count based on source type
-            if source == DataSource.BMTC:
-                if 'live_data' in data:
-                    live_data = data['live_data']
-                    data_count = len(live_data)
-                    
-                    # Find most recent update
-                    if live_data:
-                        timestamps = []
-                        for vehicle in live_data:
-                            if 'last_updated' in vehicle:
-                                try:
-                                    ts = datetime.fromisoformat(vehicle['last_updated'].replace('Z', '+00:00'))
-                                    timestamps.append(ts)
-                                except:
-                                    pass
-                        
-                        if timestamps:
-                            last_update = max(timestamps)
-                            age_seconds = (datetime.now() - last_update.replace(tzinfo=None)).total_seconds()
+            last_update, data_count = self._SOURCE_PARSERS[source](data, now)
             
-            elif source == DataSource.BMRCL:
-                if 'live_data' in data:
-                    live_data = data['live_data']
-                    data_count = len(live_data)
-                    
-                    # Find most recent update
-                    if live_data:
-                        timestamps = []
-                        for train in live_data:
-                            if 'last_updated' in train:
-                                try:
-                                    ts = datetime.fromisoformat(train['last_updated'].replace('Z', '+00:00'))
-                                    timestamps.append(ts)
-                                except:
-                                    pass
-                        
-                        if timestamps:
-                            last_update = max(timestamps)
-                            age_seconds = (datetime.now() - last_update.replace(tzinfo=None)).total_seconds()
-            
-            elif source == DataSource.TAXI:
-                if 'options' in data:
-                    data_count = len(data['options'])
-                    
-                    # For taxi data, use the response timestamp
-                    if 'timestamp' in data:
-                        try:
-                            last_update = datetime.fromisoformat(data['timestamp'].replace('Z', '+00:00'))
-                            age_seconds = (datetime.now() - last_update.replace(tzinfo=None)).total_seconds()
-                        except:
-                            pass
-            
-            elif source == DataSource.ROUTING:
-                # For routing/health endpoint, check if service is responsive
-                if 'status' in data and data['status'] == 'healthy':
-                    last_update = datetime.now()
-                    age_seconds = 0
-                    data_count = 1
-            
-            # If we couldn't extract timestamp, assume data is stale
-            if last_update is None:
-                age_seconds = float('inf')
+            # Without a timestamp the age stays infinite (data assumed stale)
+            if last_update is not None:
+                age_seconds = (now - last_update.replace(tzinfo=None)).total_seconds()
             
         except Exception as e:
             logger.error(f"Error analyzing response for {source.value}: {e}")
             age_seconds = float('inf')
         
         # Determine freshness status
-        threshold = self.thresholds[source]
+        threshold = self._threshold_arr[_SOURCE_INDEX[source]]
         
         if age_seconds == float('inf'):
             status = FreshnessStatus.UNAVAILABLE
@@ -366,109 +599,38 @@ class DataFreshnessValidator:
     def _add_to_history(self, source: DataSource, freshness_info: DataFreshnessInfo):
         """Add freshness info to historical data"""
         history = self.freshness_history[source]
-        history.append({
-            'timestamp': datetime.now(),
+        stats = self._trend_stats[source]
+        entry = {
+            'timestamp': time.monotonic(),  # monotonic seconds, immune to clock changes
             'age_seconds': freshness_info.age_seconds,
             'status': freshness_info.status,
             'data_count': freshness_info.data_count,
             'response_time_ms': freshness_info.response_time_ms
-        })
+        }
         
-        # Keep only recent history
-        if len(history) > self.max_history_size:
-            history.pop(0)
+        # Keep the running trend sums in step with the bounded history
+        if len(history) == history.maxlen:
+            stats.remove_oldest(history[0])
+        history.append(entry)
+        stats.add(entry)
     
     async def trigger_data_refresh(self, source: DataSource) -> bool:
         """Trigger data refresh for a specific source"""
         logger.info(f"Triggering data refresh for {source.value}")
         
+        path, timeout, success_message = self._REFRESH_SPECS[source]
         try:
-            # Different refresh strategies for different sources
-            if source == DataSource.BMTC:
-                return await self._refresh_bmtc_data()
-            elif source == DataSource.BMRCL:
-                return await self._refresh_bmrcl_data()
-            elif source == DataSource.TAXI:
-                return await self._refresh_taxi_data()
-            elif source == DataSource.ROUTING:
-                return await self._refresh_routing_data()
-            
-        except Exception as e:
-            logger.error(f"Error refreshing {source.value}: {e}")
-            return False
-        
-        return False
-    
-    async def _refresh_bmtc_data(self) -> bool:
-        """Refresh BMTC data"""
-        try:
-            # Call the refresh endpoint
-            url = f"{self.base_url}/api/refresh/bmtc"
-            response = self.session.post(url, timeout=30)
+            response = await self._get_client().post(f"{self.base_url}{path}", timeout=timeout)
             
             if response.status_code == 200:
-                logger.info("BMTC data refresh triggered successfully")
+                logger.info(success_message)
                 return True
             else:
-                logger.error(f"BMTC refresh failed: HTTP {response.status_code}")
+                logger.error(f"{source.value} refresh failed: HTTP {response.status_code}")
                 return False
                 
         except Exception as e:
-            logger.error(f"BMTC refresh error: {e}")
-            return False
-    
-    async def _refresh_bmrcl_data(self) -> bool:
-        """Refresh BMRCL data"""
-        try:
-            # Call the refresh endpoint
-            url = f"{self.base_url}/api/refresh/bmrcl"
-            response = self.session.post(url, timeout=30)
-            
-            if response.status_code == 200:
-                logger.info("BMRCL data refresh triggered successfully")
-                return True
-            else:
-                logger.error(f"BMRCL refresh failed: HTTP {response.status_code}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"BMRCL refresh error: {e}")
-            return False
-    
-    async def _refresh_taxi_data(self) -> bool:
-        """Refresh taxi data"""
-        try:
-            # Clear taxi cache
-            url = f"{self.base_url}/api/taxi/clear_cache"
-            response = self.session.post(url, timeout=10)
-            
-            if response.status_code == 200:
-                logger.info("Taxi data cache cleared successfully")
-                return True
-            else:
-                logger.error(f"Taxi cache clear failed: HTTP {response.status_code}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Taxi refresh error: {e}")
-            return False
-    
-    async def _refresh_routing_data(self) -> bool:
-        """Refresh routing data"""
-        try:
-            # Restart routing service health check
-            url = f"{self.base_url}/api/routing/health_check"
-            response = self.session.post(url, timeout=10)
-            
-            if response.status_code == 200:
-                logger.info("Routing service health check triggered")
-                return True
-            else:
-                logger.error(f"Routing health check failed: HTTP {response.status_code}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Routing refresh error: {e}")
+            logger.error(f"Error refreshing {source.value}: {e}")
             return False
     
     async def auto_refresh_stale_data(self) -> Dict[DataSource, bool]:
@@ -476,26 +638,22 @@ class DataFreshnessValidator:
         logger.info("Starting automatic refresh of stale data")
         
         report = await self.validate_all_sources()
-        refresh_results = {}
         
-        # Refresh expired sources first
-        for source in report.expired_sources:
-            logger.info(f"Auto-refreshing expired source: {source.value}")
-            success = await self.trigger_data_refresh(source)
-            refresh_results[source] = success
-            
-            if success:
-                # Wait a bit for the refresh to take effect
-                await asyncio.sleep(2)
-        
-        # Refresh stale sources
-        for source in report.stale_sources:
-            logger.info(f"Auto-refreshing stale source: {source.value}")
-            success = await self.trigger_data_refresh(source)
-            refresh_results[source] = success
-            
-            if success:
-                await asyncio.sleep(2)
+        # Expired sources first, then stale ones; the refreshes hit independent
+        # endpoints, so they are all triggered at once
+        to_refresh = list(dict.fromkeys(report.expired_sources + report.stale_sources))
+        for source in to_refresh:
+            logger.info(f"Auto-refreshing {'expired' if source in report.expired_sources else 'stale'} source: {source.value}")
+        
+        results = await asyncio.gather(
+            *(self.trigger_data_refresh(source) for source in to_refresh),
+            return_exceptions=True
+        )
+        refresh_results = {source: result is True for source, result in zip(to_refresh, results)}
+        
+        # Wait a bit for the refreshes to take effect
+        if any(refresh_results.values()):
+            await asyncio.sleep(2)
         
         logger.info(f"Auto-refresh completed. Results: {refresh_results}")
         return refresh_results
@@ -507,9 +665,25 @@ class DataFreshnessValidator:
         if not history:
             return {'error': 'No historical data available'}
         
-        # Filter recent history
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        recent_history = [h for h in history if h['timestamp'] > cutoff_time]
+        # When the whole history falls inside the window, answer from the
+        # running sums instead of re-scanning it
+        cutoff = time.monotonic() - hours * 3600
+        stats = self._trend_stats[source]
+        if history[0]['timestamp'] > cutoff and stats.count == len(history):
+            return {
+                'source': source.value,
+                'period_hours': hours,
+                'total_checks': stats.count,
+                'avg_age_seconds': stats.age_sum / stats.age_count if stats.age_count else None,
+                'max_age_seconds': stats.max_age,
+                'avg_response_time_ms': stats.response_time_sum / stats.count,
+                'avg_data_count': stats.data_count_sum / stats.count,
+                'status_distribution': dict(stats.status_counts)
+            }
+        
+        # Filter recent history; entries are appended in time order, so
+        # skipping stops at the first one inside the window
+        recent_history = list(itertools.dropwhile(lambda h: h['timestamp'] <= cutoff, history))
         
         if not recent_history:
             return {'error': f'No data in the last {hours} hours'}
@@ -538,46 +712,23 @@ class DataFreshnessValidator:
     def get_system_health_score(self) -> float:
         """Calculate overall system health score (0-100)"""
         try:
-            # Get latest freshness info for all sources
-            total_score = 0
-            total_weight = 0
+            # Latest freshness info for every source that has been checked
+            latest = [
+                (i, self.freshness_history[source][-1])
+                for i, source in enumerate(_SOURCES)
+                if self.freshness_history[source]
+            ]
+            if not latest:
+                return 0
             
-            # Weights for different sources
-            weights = {
-                DataSource.BMTC: 30,    # Critical
-                DataSource.BMRCL: 30,   # Critical
-                DataSource.TAXI: 20,    # Important
-                DataSource.ROUTING: 20  # Important
-            }
+            weights = self._health_weights[[i for i, _ in latest]]
+            scores = np.array([_STATUS_SCORES[entry['status']] for _, entry in latest])
+            response_times = np.array([entry['response_time_ms'] for _, entry in latest])
             
-            for source in DataSource:
-                history = self.freshness_history[source]
-                if not history:
-                    continue
-                
-                latest = history[-1]
-                weight = weights[source]
-                
-                # Score based on status
-                if latest['status'] == FreshnessStatus.FRESH:
-                    score = 100
-                elif latest['status'] == FreshnessStatus.STALE:
-                    score = 70
-                elif latest['status'] == FreshnessStatus.EXPIRED:
-                    score = 30
-                else:  # UNAVAILABLE
-                    score = 0
-                
-                # Adjust score based on response time
-                if latest['response_time_ms'] > 5000:
-                    score *= 0.8  # Penalty for slow response
-                elif latest['response_time_ms'] > 2000:
-                    score *= 0.9
-                
-                total_score += score * weight
-                total_weight += weight
+            # Penalty for slow responses
+            penalties = np.where(response_times > 5000, 0.8, np.where(response_times > 2000, 0.9, 1.0))
             
-            return total_score / total_weight if total_weight > 0 else 0
+            return float((scores * penalties * weights).sum() / weights.sum())
             
         except Exception as e:
             logger.error(f"Error calculating health score: {e}")
@@ -586,6 +737,10 @@ class DataFreshnessValidator:
 # Global instance
 data_freshness_validator = DataFreshnessValidator()
 
+# Close pooled connections explicitly on shutdown instead of leaving them to
+# garbage collection, where they can linger in CLOSE_WAIT
+atexit.register(data_freshness_validator.close)
+
 async def test_data_freshness_validator():
     """Test the data freshness validator"""
     logger.info("Testing data freshness validator...")
@@ -4,17 +4,38 @@ Enhanced Distance Calculator for WayForge Transit System
 Provides accurate distance calculations with path segmentation and cumulative tracking
 """
 
-import math
 import logging
-from typing import List, Tuple, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Tuple, Dict, Any, Optional, Iterator, Union
+from dataclasses import dataclass, asdict
 from geopy.distance import geodesic
 import numpy as np
 
 try:
-    from .common import setup_logging
+    from pyproj import Geod
+    # WGS84 ellipsoid, the same model geopy's geodesic uses
+    _GEOD = Geod(ellps='WGS84')
+    PYPROJ_AVAILABLE = True
 except ImportError:
-    # Fallback for when running as standalone script
+    _GEOD = None
+    PYPROJ_AVAILABLE = False
+
+try:
+    from .common import (
+        setup_logging, njit, NUMBA_AVAILABLE, calculate_distance_nb,
+        precompute_geopoints, segment_distances_precomputed
+    )
+except ImportError:
+    # Fallback for when running as standalone script. Shared kernels still
+    # come from utils.common, the module name numba's disk cache records
+    import sys
+    from pathlib import Path
+    _project_root = str(Path(__file__).resolve().parent.parent)
+    if _project_root not in sys.path:
+        sys.path.append(_project_root)
+    from utils.common import (
+        njit, NUMBA_AVAILABLE, calculate_distance_nb,
+        precompute_geopoints, segment_distances_precomputed
+    )
     import logging
     def setup_logging(name):
         logger = logging.getLogger(name)
@@ -40,18 +61,101 @@ except ImportError:
             return wrapper
         return decorator
     
-    def performance_monitor(func):
-        def wrapper(*args, **kwargs):
-            import time
-            start_time = time.time()
-            result = func(*args, **kwargs)
-            end_time = time.time()
-            print(f"{func.__name__} took {end_time - start_time:.3f} seconds")
-            return result
-        return wrapper
+    def performance_monitor(component_name):
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                import time
+                start_time = time.time()
+                result = func(*args, **kwargs)
+                end_time = time.time()
+                print(f"{func.__name__} took {end_time - start_time:.3f} seconds")
+                return result
+            return wrapper
+        return decorator
 
 logger = setup_logging("enhanced_distance_calculator")
 
+EARTH_RADIUS_KM = 6371.0
+
+# numba's disk cache records the importing module's name, so kernels compiled
+# by a standalone import could not be loaded back by a package import
+_CACHE_KERNELS = bool(__package__)
+
+# Road types by the int8 id the path kernels emit
+ROAD_TYPES = ('highway', 'arterial', 'local', 'pedestrian', 'default')
+
+# Road classification rule per transport mode; other modes map to 'default'
+_ROAD_RULE_IDS = {'walking': 0, 'cycling': 1, 'driving': 2, 'taxi': 2}
+_ROAD_RULE_DEFAULT = 3
+
+@njit(cache=_CACHE_KERNELS)
+def _road_type_id_nb(distance: float, rule_id: int) -> int:
+    """
+    Road type id from a segment's Haversine distance (km)
+    This is a simplified heuristic - could be enhanced with actual road data
+    """
+    if rule_id == 0:
+        return 3  # pedestrian
+    elif rule_id == 1:
+        return 2 if distance < 2.0 else 1  # local / arterial
+    elif rule_id == 2:
+        if distance > 5.0:
+            return 0  # highway
+        elif distance > 1.0:
+            return 1  # arterial
+        else:
+            return 2  # local
+    else:
+        return 4  # default
+
+@njit(cache=_CACHE_KERNELS, nogil=True)
+def _path_distances_nb(lat: np.ndarray, lng: np.ndarray, base_km: np.ndarray, rule_id: int,
+                       mult_lut: np.ndarray, mode_multiplier: float):
+    """
+    Road-adjusted segment distances of a path in one compiled pass
+    
+    Each segment's Haversine distance picks its road type, whose multiplier
+    scales the base distance (base_km, or the Haversine distance itself when
+    base_km is empty) into a running total. The GIL is released while it
+    runs, so paths requested from several server threads are computed in
+    parallel.
+    
+    Returns:
+        (road type ids, adjusted distances, cumulative distances)
+    """
+    n = lat.shape[0] - 1
+    road_type_ids = np.empty(n, np.int8)
+    adjusted = np.empty(n)
+    cumulative = np.empty(n)
+    total = 0.0
+    for i in range(n):
+        haversine_km = calculate_distance_nb(lat[i], lng[i], lat[i + 1], lng[i + 1])
+        road_type_id = _road_type_id_nb(haversine_km, rule_id)
+        base = base_km[i] if base_km.shape[0] else haversine_km
+        adjusted[i] = base * (mult_lut[road_type_id] * mode_multiplier)
+        total += adjusted[i]
+        cumulative[i] = total
+        road_type_ids[i] = road_type_id
+    return road_type_ids, adjusted, cumulative
+
+def _path_distances_vec(lat: np.ndarray, lng: np.ndarray, base_km: np.ndarray, rule_id: int,
+                        mult_lut: np.ndarray, mode_multiplier: float):
+    """NumPy counterpart of _path_distances_nb for when numba is unavailable"""
+    # Per-point trig is taken once and shared by the two segments at each point
+    haversine_km = segment_distances_precomputed(precompute_geopoints(np.column_stack((lat, lng))))
+    if rule_id == 0:
+        road_type_ids = np.full(len(haversine_km), 3, dtype=np.int8)
+    elif rule_id == 1:
+        road_type_ids = np.where(haversine_km < 2.0, 2, 1).astype(np.int8)
+    elif rule_id == 2:
+        road_type_ids = np.select([haversine_km > 5.0, haversine_km > 1.0], [0, 1], 2).astype(np.int8)
+    else:
+        road_type_ids = np.full(len(haversine_km), 4, dtype=np.int8)
+    
+    base = base_km if len(base_km) else haversine_km
+    adjusted = base * (mult_lut[road_type_ids] * mode_multiplier)
+    return road_type_ids, adjusted, np.cumsum(adjusted)
+
 @dataclass
 class PathSegment:
     """Represents a segment of a path with detailed distance information"""
@@ -64,13 +168,70 @@ class PathSegment:
     elevation_gain: float = 0.0
     traffic_factor: float = 1.0  # Multiplier for traffic conditions
 
+@dataclass
+class PathSegmentsSoA:
+    """
+    Columnar storage for the segments of one path
+    
+    Coordinates and distances are parallel float64 arrays; indexing or
+    iterating materializes PathSegment objects on demand, and slicing returns
+    another PathSegmentsSoA, so the class can stand in for a list of segments.
+    dataclasses.asdict() sees the raw arrays; use to_dicts() for JSON.
+    """
+    start_lat: np.ndarray
+    start_lng: np.ndarray
+    end_lat: np.ndarray
+    end_lng: np.ndarray
+    distance_km: np.ndarray
+    road_type_ids: np.ndarray  # int8 indices into ROAD_TYPES
+    transport_mode: str
+    
+    def __len__(self) -> int:
+        return len(self.distance_km)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[PathSegment, 'PathSegmentsSoA']:
+        if isinstance(index, slice):
+            return PathSegmentsSoA(
+                start_lat=self.start_lat[index],
+                start_lng=self.start_lng[index],
+                end_lat=self.end_lat[index],
+                end_lng=self.end_lng[index],
+                distance_km=self.distance_km[index],
+                road_type_ids=self.road_type_ids[index],
+                transport_mode=self.transport_mode
+            )
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return PathSegment(
+            start_point=(float(self.start_lat[index]), float(self.start_lng[index])),
+            end_point=(float(self.end_lat[index]), float(self.end_lng[index])),
+            distance_km=float(self.distance_km[index]),
+            segment_type=self.transport_mode,
+            transport_mode=self.transport_mode,
+            road_type=ROAD_TYPES[self.road_type_ids[index]]
+        )
+    
+    def __iter__(self) -> Iterator[PathSegment]:
+        for i in range(len(self)):
+            yield self[i]
+    
+    def to_list(self) -> List[PathSegment]:
+        """Materialize every segment as a PathSegment"""
+        return list(self)
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Segments as plain dicts, the shape asdict() gave for a list of PathSegment"""
+        return [asdict(segment) for segment in self]
+
 @dataclass
 class PathAnalysis:
     """Complete analysis of a path with detailed distance breakdown"""
     total_distance_km: float
     straight_line_distance_km: float
     path_efficiency: float  # ratio of straight line to actual path
-    segments: List[PathSegment]
+    segments: PathSegmentsSoA
     cumulative_distances: List[float]
     elevation_profile: List[float]
     transport_modes: List[str]
@@ -83,7 +244,7 @@ class EnhancedDistanceCalculator:
         self.logger = logger
         
         # Earth's radius in kilometers
-        self.EARTH_RADIUS_KM = 6371.0
+        self.EARTH_RADIUS_KM = EARTH_RADIUS_KM
         
         # Road type multipliers for more accurate distance estimation
         self.road_multipliers = {
@@ -93,6 +254,8 @@ class EnhancedDistanceCalculator:
             'pedestrian': 1.35,   # Walking paths with more detours
             'default': 1.20       # Default multiplier
         }
+        # Multipliers indexed by the road type ids the path kernels emit
+        self._mult_lut = np.array([self.road_multipliers[road_type] for road_type in ROAD_TYPES])
         
         # Transport mode speed factors for time-based distance validation
         self.speed_factors = {
@@ -103,29 +266,23 @@ class EnhancedDistanceCalculator:
             'metro': 40.0,        # km/h
             'bus': 20.0          # km/h
         }
+        # Speeds indexed by transport mode id; the last slot is the fallback speed
+        self._mode_ids = {mode: i for i, mode in enumerate(self.speed_factors)}
+        self._speed_lut = np.array(list(self.speed_factors.values()) + [25.0])
 
     @error_handler_decorator("enhanced_distance_calculator")
-    @performance_monitor
+    @performance_monitor("enhanced_distance_calculator")
     def calculate_haversine_distance(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
         """
         Calculate precise Haversine distance between two points
         Uses high-precision formula for better accuracy
         """
-        # Convert to radians
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lng = math.radians(lng2 - lng1)
-        
-        # Haversine formula with high precision
-        a = (math.sin(delta_lat / 2) ** 2 + 
-             math.cos(lat1_rad) * math.cos(lat2_rad) * 
-             math.sin(delta_lng / 2) ** 2)
-        
-        # Use atan2 for better numerical stability
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        
-        return self.EARTH_RADIUS_KM * c
+        return self._haversine(lat1, lng1, lat2, lng2)
+    
+    def _haversine(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+        """Undecorated Haversine distance for internal per-segment use"""
+        # Shared compiled Haversine kernel from utils.common
+        return calculate_distance_nb(float(lat1), float(lng1), float(lat2), float(lng2))
 
     @error_handler_decorator("enhanced_distance_calculator")
     def calculate_geodesic_distance(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
@@ -138,7 +295,7 @@ class EnhancedDistanceCalculator:
             return distance
         except Exception as e:
             self.logger.warning(f"Geodesic calculation failed, falling back to Haversine: {e}")
-            return self.calculate_haversine_distance(lat1, lng1, lat2, lng2)
+            return self._haversine(lat1, lng1, lat2, lng2)
 
     @error_handler_decorator("enhanced_distance_calculator")
     def calculate_path_distance(self, geometry: List[Tuple[float, float]], 
@@ -148,7 +305,8 @@ class EnhancedDistanceCalculator:
         Calculate accurate distance for a complete path with segmentation
         
         Args:
-            geometry: List of (lat, lng) coordinates defining the path
+            geometry: List of (lat, lng) coordinates, or an (N, 2) float array,
+                defining the path
             transport_mode: Type of transport for appropriate calculations
             use_geodesic: Whether to use geodesic (more accurate) or Haversine calculation
         
@@ -158,55 +316,60 @@ class EnhancedDistanceCalculator:
         if len(geometry) < 2:
             raise ValueError("Path must contain at least 2 points")
         
-        segments = []
-        cumulative_distances = [0.0]
-        total_distance = 0.0
+        points = np.asarray(geometry, dtype=np.float64)
+        lats, lngs = points[:, 0], points[:, 1]
         
         # Calculate distance function based on preference
-        distance_func = self.calculate_geodesic_distance if use_geodesic else self.calculate_haversine_distance
+        distance_func = self.calculate_geodesic_distance if use_geodesic else self._haversine
+        
+        # Geodesic base distances; left empty in Haversine mode, where the
+        # path kernel's own Haversine distances are used
+        if use_geodesic and PYPROJ_AVAILABLE:
+            # One batched call into PROJ's compiled geodesic solver
+            _, _, distances_m = _GEOD.inv(lngs[:-1], lats[:-1], lngs[1:], lats[1:])
+            base_distances = distances_m / 1000.0
+        elif use_geodesic:
+            coords = points.tolist()
+            base_distances = np.array([
+                distance_func(coords[i][0], coords[i][1], coords[i + 1][0], coords[i + 1][1])
+                for i in range(len(coords) - 1)
+            ])
+        else:
+            base_distances = np.empty(0)
         
-        # Process each segment
-        for i in range(len(geometry) - 1):
-            start_point = geometry[i]
-            end_point = geometry[i + 1]
-            
-            # Calculate base distance
-            segment_distance = distance_func(
-                start_point[0], start_point[1],
-                end_point[0], end_point[1]
-            )
-            
-            # Apply road type multiplier based on segment characteristics
-            road_type = self._determine_road_type(start_point, end_point, transport_mode)
-            multiplier = self.road_multipliers.get(road_type, self.road_multipliers['default'])
-            
-            # Adjust for transport mode
-            if transport_mode == 'walking':
-                # Walking paths may have more detours
-                multiplier *= 1.1
-            elif transport_mode == 'cycling':
-                # Cycling may use more direct routes
-                multiplier *= 0.95
-            
-            adjusted_distance = segment_distance * multiplier
-            total_distance += adjusted_distance
-            cumulative_distances.append(total_distance)
-            
-            # Create segment
-            segment = PathSegment(
-                start_point=start_point,
-                end_point=end_point,
-                distance_km=adjusted_distance,
-                segment_type=transport_mode,
-                transport_mode=transport_mode,
-                road_type=road_type
-            )
-            segments.append(segment)
+        # Adjust for transport mode
+        if transport_mode == 'walking':
+            # Walking paths may have more detours
+            mode_multiplier = 1.1
+        elif transport_mode == 'cycling':
+            # Cycling may use more direct routes
+            mode_multiplier = 0.95
+        else:
+            mode_multiplier = 1.0
+        
+        # Classify road types, apply their multipliers and accumulate in one pass
+        rule_id = _ROAD_RULE_IDS.get(transport_mode, _ROAD_RULE_DEFAULT)
+        path_distances = _path_distances_nb if NUMBA_AVAILABLE else _path_distances_vec
+        road_type_ids, adjusted_distances, cumulative = path_distances(
+            lats, lngs, base_distances, rule_id, self._mult_lut, mode_multiplier
+        )
+        total_distance = float(cumulative[-1])
+        cumulative_distances = [0.0] + cumulative.tolist()
+        
+        segments = PathSegmentsSoA(
+            start_lat=lats[:-1],
+            start_lng=lngs[:-1],
+            end_lat=lats[1:],
+            end_lng=lngs[1:],
+            distance_km=adjusted_distances,
+            road_type_ids=road_type_ids,
+            transport_mode=transport_mode
+        )
         
         # Calculate straight-line distance for efficiency analysis
         straight_line_distance = distance_func(
-            geometry[0][0], geometry[0][1],
-            geometry[-1][0], geometry[-1][1]
+            float(lats[0]), float(lngs[0]),
+            float(lats[-1]), float(lngs[-1])
         )
         
         # Calculate path efficiency
@@ -226,34 +389,8 @@ class EnhancedDistanceCalculator:
             estimated_accuracy=estimated_accuracy
         )
 
-    def _determine_road_type(self, start_point: Tuple[float, float], 
-                           end_point: Tuple[float, float], 
-                           transport_mode: str) -> str:
-        """
-        Determine road type based on segment characteristics
-        This is a simplified heuristic - could be enhanced with actual road data
-        """
-        distance = self.calculate_haversine_distance(
-            start_point[0], start_point[1],
-            end_point[0], end_point[1]
-        )
-        
-        if transport_mode == 'walking':
-            return 'pedestrian'
-        elif transport_mode == 'cycling':
-            return 'local' if distance < 2.0 else 'arterial'
-        elif transport_mode in ['driving', 'taxi']:
-            if distance > 5.0:
-                return 'highway'
-            elif distance > 1.0:
-                return 'arterial'
-            else:
-                return 'local'
-        else:
-            return 'default'
-
     def _estimate_accuracy(self, geometry: List[Tuple[float, float]], 
-                          segments: List[PathSegment], 
+                          segments: PathSegmentsSoA, 
                           transport_mode: str) -> float:
         """
         Estimate the accuracy of distance calculation based on various factors
@@ -264,7 +401,7 @@ class EnhancedDistanceCalculator:
         point_factor = min(1.0, len(geometry) / 50.0) * 0.1
         
         # Shorter segments generally mean higher accuracy
-        avg_segment_length = sum(s.distance_km for s in segments) / len(segments) if segments else 0
+        avg_segment_length = float(segments.distance_km.mean()) if len(segments) else 0
         segment_factor = max(0, 0.05 - avg_segment_length * 0.01)
         
         # Transport mode affects accuracy
@@ -378,7 +515,7 @@ class EnhancedDistanceCalculator:
         
         # Validate against expected duration if provided
         if expected_duration_minutes:
-            expected_speed = self.speed_factors.get(transport_mode, 25.0)
+            expected_speed = float(self._speed_lut[self._mode_ids.get(transport_mode, -1)])
             duration_based_distance = (expected_duration_minutes / 60.0) * expected_speed
             validation_results['alternative_calculations']['duration_based_km'] = duration_based_distance
             
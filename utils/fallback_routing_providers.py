@@ -39,10 +39,10 @@ class FallbackRoute:
 class GoogleDirectionsProvider:
     """Google Directions API fallback provider"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.api_key = os.getenv('GOOGLE_MAPS_API_KEY', '')
         self.base_url = "https://maps.googleapis.com/maps/api/directions/json"
-        self.session = requests.Session()
+        self.session = session or requests.Session()
         
     @error_handler_decorator("google_directions")
     @performance_monitor("google_directions")
@@ -181,10 +181,10 @@ class GoogleDirectionsProvider:
 class MapboxProvider:
     """Mapbox Directions API fallback provider"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.access_token = os.getenv('MAPBOX_ACCESS_TOKEN', '')
         self.base_url = "https://api.mapbox.com/directions/v5/mapbox"
-        self.session = requests.Session()
+        self.session = session or requests.Session()
         
     @error_handler_decorator("mapbox_directions")
     @performance_monitor("mapbox_directions")
@@ -278,9 +278,9 @@ class MapboxProvider:
 class OSRMProvider:
     """OSRM (Open Source Routing Machine) fallback provider"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.base_url = "http://router.project-osrm.org/route/v1"
-        self.session = requests.Session()
+        self.session = session or requests.Session()
         
     @error_handler_decorator("osrm_directions")
     @performance_monitor("osrm_directions")
@@ -434,11 +434,11 @@ class LocalGTFSProvider:
 class FallbackRoutingManager:
     """Manages fallback routing providers with automatic switching"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.providers = {
-            'google': GoogleDirectionsProvider(),
-            'mapbox': MapboxProvider(),
-            'osrm': OSRMProvider(),
+            'google': GoogleDirectionsProvider(session),
+            'mapbox': MapboxProvider(session),
+            'osrm': OSRMProvider(session),
             'local_gtfs': LocalGTFSProvider()
         }
         
@@ -52,10 +52,10 @@ class TaxiResponse:
 class OlaAPIProvider:
     """Ola API integration (Note: Ola doesn't have public API, this is a mock structure)"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.api_key = os.getenv('OLA_API_KEY', '')
         self.base_url = "https://api.ola.com/v1"  # Hypothetical URL
-        self.session = requests.Session()
+        self.session = session or requests.Session()
         
     @error_handler_decorator("ola_api")
     @performance_monitor("ola_api")
@@ -82,7 +82,10 @@ class OlaAPIProvider:
                 'drop_lng': dest_lng
             }
             
-            response = self.session.post(
+            # requests blocks, so run it off the event loop; this keeps the
+            # loop free and lets callers' timeouts fire
+            response = await asyncio.to_thread(
+                self.session.post,
                 f"{self.base_url}/fare_estimate",
                 headers=headers,
                 json=payload,
@@ -124,12 +127,12 @@ class OlaAPIProvider:
 class UberAPIProvider:
     """Uber API integration"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.client_id = os.getenv('UBER_CLIENT_ID', '')
         self.client_secret = os.getenv('UBER_CLIENT_SECRET', '')
         self.server_token = os.getenv('UBER_SERVER_TOKEN', '')
         self.base_url = "https://api.uber.com/v1.2"
-        self.session = requests.Session()
+        self.session = session or requests.Session()
         
     @error_handler_decorator("uber_api")
     @performance_monitor("uber_api")
@@ -155,7 +158,9 @@ class UberAPIProvider:
             }
             
             # Get price estimates
-            price_response = self.session.get(
+            # Requests run off the event loop so callers' timeouts can fire
+            price_response = await asyncio.to_thread(
+                self.session.get,
                 f"{self.base_url}/estimates/price",
                 headers=headers,
                 params=params,
@@ -168,7 +173,8 @@ class UberAPIProvider:
                 'start_longitude': source_lng
             }
             
-            time_response = self.session.get(
+            time_response = await asyncio.to_thread(
+                self.session.get,
                 f"{self.base_url}/estimates/time",
                 headers=headers,
                 params=time_params,
@@ -321,10 +327,10 @@ class MockTaxiProvider:
 class TaxiIntegrationService:
     """Main service for taxi integration with fallback mechanisms"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.providers = {
-            'ola': OlaAPIProvider(),
-            'uber': UberAPIProvider(),
+            'ola': OlaAPIProvider(session),
+            'uber': UberAPIProvider(session),
             'mock': MockTaxiProvider()
         }
         
@@ -1810,6 +1810,8 @@ def get_all_transport_options():
             })
             
         finally:
+            # The freshness validator's HTTP client is bound to this loop
+            loop.run_until_complete(consolidated_transport_api.freshness_validator.aclose())
             loop.close()
         
     except ValueError as e:
@@ -1849,6 +1851,8 @@ def get_transport_quick_summary():
             })
             
         finally:
+            # The freshness validator's HTTP client is bound to this loop
+            loop.run_until_complete(consolidated_transport_api.freshness_validator.aclose())
             loop.close()
         
     except ValueError as e: